@@ -0,0 +1,131 @@
+import gzip
+from collections import OrderedDict
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+
+def negotiate_encoding(accept_encoding):
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    if accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding, level):
+    if encoding == "br":
+        return brotli.compress(body, quality=min(level, 11))
+    # mtime=0 keeps the output byte-identical across workers and restarts.
+    return gzip.compress(body, compresslevel=min(level, 9), mtime=0)
+
+
+class CompressedResponseCache:
+    # LRU of compressed bodies keyed by (ETag, encoding, level). An ETag names one revision of one representation,
+    # so an entry can never go stale; edits produce new ETags and old entries age out.
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, etag, encoding, level, body):
+        key = (etag, encoding, level)
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compressed
+
+        self.misses += 1
+        compressed = compress(body, encoding, level)
+        if len(compressed) <= self.max_bytes:
+            self._entries[key] = compressed
+            self.size += len(compressed)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+        return compressed
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+compressed_responses = CompressedResponseCache(settings.COMPRESSION_CACHE_BYTES)
+
+
+class PrecompressedResponseMiddleware:
+    # 200 responses that carry an ETag (the catalog reads) are compressed once per revision and served from the cache
+    # above. Everything else leaves uncompressed rather than being compressed again on every request.
+    def __init__(self, app, minimum_size=500, route_label=None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.route_label = route_label
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        held_start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal held_start, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] == 200 and "etag" in headers and "content-encoding" not in headers:
+                    held_start = message
+                    return
+                passthrough = True
+                await send(message)
+                return
+
+            if passthrough or held_start is None or message.get("more_body", False):
+                # Streaming bodies are not cached; release the held headers and step aside.
+                if held_start is not None:
+                    await send(held_start)
+                    held_start = None
+                passthrough = True
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=held_start["headers"])
+            if len(body) >= self.minimum_size:
+                level = settings.COMPRESSION_LEVELS.get(self.route_label(scope) if self.route_label else "", settings.COMPRESSION_LEVEL)
+                body = compressed_responses.get_or_compress(headers["etag"], encoding, level, body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+
+            await send(held_start)
+            held_start = None
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
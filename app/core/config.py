@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,14 +10,66 @@ class Settings(BaseSettings):
     SQLITE_URL: str
     POSTGRES_URL: str
     POSTGRES_URL_ASYNC: str
+    POSTGRES_REPLICA_URL_ASYNC: str | None = None
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    PRESERIALIZED_RESPONSES: bool = False
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    MENU_TRANSFER_BATCH_SIZE: int = 500
+    LOCATION_GRID_CELL_DEGREES: float = 0.1
+    DELIVERY_ZONE_GRID_CELL_DEGREES: float = 0.05
+    LOCATION_TIMEZONE: str = "UTC"
+    QUERY_BUDGET_MODE: Literal["off", "warn", "raise"] = "off"
+    QUERY_REPEAT_THRESHOLD: int = 3
+    AUTO_MIGRATE: bool = False
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATES: dict[str, float] = {"sqlalchemy.engine": 0.01}
+    SQL_ECHO: bool = False
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_LEVELS: dict[str, int] = {}
+    COMPRESSION_CACHE_BYTES: int = 64 * 1024 * 1024
+    # Directory for the host-wide catalog cache shared by all workers (e.g. /dev/shm/oo-catalog); it is re-stamped when
+    # the first worker on the host starts. Unset keeps snapshots and their versions per process.
+    SHARED_CACHE_DIR: str | None = None
+    SHARED_CACHE_VERSION_SLOTS: int = 65536
+    # "auto" is Postgres LISTEN/NOTIFY, or unix datagram sockets between the workers of one host in DEBUG (SQLite).
+    # "memory" never leaves the process: tests and single-worker runs only.
+    INVALIDATION_BACKEND: Literal["auto", "memory", "local", "postgres"] = "auto"
+    INVALIDATION_CHANNEL: str = "oo_invalidation"
+    # Socket directory for the "local" backend; defaults to one per database URL under the system temp dir.
+    INVALIDATION_SOCKET_DIR: str | None = None
+    SINGLE_FLIGHT_READS: bool = True
 
     @property
     def DATABASE_URL(self) -> str:
         return self.SQLITE_URL if self.DEBUG else self.POSTGRES_URL_ASYNC
 
+    @property
+    def SYNC_DATABASE_URL(self) -> str:
+        if self.DEBUG:
+            return self.SQLITE_URL.replace("+aiosqlite", "")
+        return self.POSTGRES_URL.replace("postgresql://", "postgresql+psycopg://", 1)
+
+    @property
+    def READ_DATABASE_URL(self) -> str:
+        if self.DEBUG or not self.POSTGRES_REPLICA_URL_ASYNC:
+            return self.DATABASE_URL
+        return self.POSTGRES_REPLICA_URL_ASYNC
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
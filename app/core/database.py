@@ -1,15 +1,17 @@
-from sqlmodel import SQLModel, Session, create_engine
-
-from app.core.config import settings
+from functools import cache
 
+from sqlmodel import Session, create_engine
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+from app.core.config import settings
 
 
-def init_db():
-    SQLModel.metadata.create_all(engine)
+# Only the migration command and offline tooling use the sync engine, so it is built on first use rather than on
+# every import of the app.
+@cache
+def get_engine():
+    return create_engine(settings.SYNC_DATABASE_URL)
 
 
 def get_session():
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         yield session
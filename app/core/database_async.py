@@ -1,24 +1,159 @@
+import time
+from functools import cache
+from contextvars import ContextVar
+
+from fastapi import Request
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel
 
 from app.core.config import settings
+from app.core.utils import TTLCache
+from app.core.metrics import metrics
+from app.core import querybudget
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            metrics.observe_pool_wait(self.metrics_name, waited)
+
+    def recreate(self):
+        # engine.dispose() and invalidation swap in a fresh pool; it must keep reporting under the same name.
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def _connect_args(url):
+    if url.startswith("postgresql+asyncpg"):
+        return {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return {}
+
+
+def _create_engine(url):
+    return create_async_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(url),
+    )
+
+
+def _instrument(async_engine, name):
+    metrics.instrument_engine(async_engine, name)
+    if settings.QUERY_BUDGET_MODE != "off":
+        querybudget.instrument_engine(async_engine)
+
+
+# Like the sync engine in app.core.database, the async engines (and their drivers) are built on first use, so the
+# migration command, data tooling and tests can import the app without opening pools they never use.
+@cache
+def get_engine():
+    async_engine = _create_engine(settings.DATABASE_URL)
+    _instrument(async_engine, "primary")
+    return async_engine
+
+
+@cache
+def get_read_engine():
+    if not has_replica():
+        return get_engine()
+    async_engine = _create_engine(settings.READ_DATABASE_URL)
+    _instrument(async_engine, "replica")
+    return async_engine
+
+
+def has_replica():
+    return settings.READ_DATABASE_URL != settings.DATABASE_URL
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-)
+_session_factory = sessionmaker(class_=AsyncSession, expire_on_commit=False)
 
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
 
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+def AsyncSessionLocal():
+    return _session_factory(bind=get_engine())
+
+
+def ReadSessionLocal():
+    return _session_factory(bind=get_read_engine())
+
+
+READ_YOUR_WRITES_COOKIE = "oo_recent_write"
+
+# Clients that mutated something recently, keyed by credentials (or address for anonymous callers).
+recent_writers = TTLCache(maxsize=100000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+# Set for the request being served when it was routed to the primary to see its own writes.
+reading_own_writes: ContextVar[bool] = ContextVar("reading_own_writes", default=False)
+
+
+def client_key(request: Request):
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return authorization
+    return request.client.host if request.client else None
+
+
+def mark_recent_write(request: Request):
+    key = client_key(request)
+    if key is not None:
+        recent_writers.set(key, True)
+
+
+def is_recent_writer(request: Request):
+    if READ_YOUR_WRITES_COOKIE in request.cookies:
+        return True
+    key = client_key(request)
+    return key is not None and recent_writers.get(key) is not None
+
+
+def pool_stats(async_engine):
+    pool = async_engine.sync_engine.pool
+    capacity = pool.size() + max(settings.DB_MAX_OVERFLOW, 0)
+
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin(),
+        "utilization": pool.checkedout() / capacity if capacity else 0.0,
+        "checkouts": pool.checkouts,
+        "timeouts": pool.timeouts,
+        "wait_avg_seconds": pool.wait_total / pool.checkouts if pool.checkouts else 0.0,
+        "wait_max_seconds": pool.wait_max,
+    }
 
 async def get_session():
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_read_session(request: Request):
+    recent_writer = is_recent_writer(request)
+    reading_own_writes.set(recent_writer)
+    session_factory = AsyncSessionLocal if recent_writer else ReadSessionLocal
+    async with session_factory() as session:
+        yield session
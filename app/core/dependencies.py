@@ -1,5 +1,13 @@
 from app.user.services import UserServices
-from app.onlineordering.services import MenuServices, OptionServices, OptionGroupServices, ItemServices
+from app.onlineordering.services import (
+    MenuServices,
+    LocationServices,
+    OptionServices,
+    OptionGroupServices,
+    ItemServices,
+    CategoryServices,
+    CartServices,
+)
 
 
 def get_user_service():
@@ -18,5 +26,17 @@ def get_item_service():
     return ItemServices()
 
 
+def get_category_service():
+    return CategoryServices()
+
+
 def get_menu_service():
     return MenuServices()
+
+
+def get_location_service():
+    return LocationServices()
+
+
+def get_cart_service():
+    return CartServices()
@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import logging
+import os
+import socket
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import batched
+from uuid import uuid4
+
+from pydantic_core import from_json, to_json
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads are capped at 8000 bytes; this many ids stays well below it.
+MAX_IDS_PER_MESSAGE = 500
+
+
+@dataclass(frozen=True)
+class Invalidation:
+    id: str
+    topic: str
+    ids: tuple[int, ...]
+    origin: str
+    node: str
+
+
+class MemoryBackend:
+    # In-process stand-in for tests: every bus attached to the same backend sees every message. It does not cross
+    # process boundaries.
+    def __init__(self):
+        self._buses = []
+
+    async def start(self, bus):
+        self._buses.append(bus)
+
+    async def stop(self, bus):
+        if bus in self._buses:
+            self._buses.remove(bus)
+
+    def send(self, payload):
+        for bus in list(self._buses):
+            bus.receive(payload)
+
+
+class UnixSocketBackend:
+    # Local stand-in for the SQLite debug mode and single-host runs with several workers: every process binds a
+    # datagram socket in one directory and a message goes to every other socket found there. The socket of a worker
+    # that is gone refuses the send and is removed by whoever notices first.
+    def __init__(self, directory):
+        self.directory = directory
+        self._socket = None
+        self._path = None
+        self.dropped = 0
+
+    async def start(self, bus):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self._path = os.path.join(self.directory, f"{os.getpid()}-{bus.origin[:8]}.sock")
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self._path)
+        self._socket.setblocking(False)
+        asyncio.get_running_loop().add_reader(self._socket.fileno(), self._read, bus)
+
+    async def stop(self, bus):
+        if self._socket is None:
+            return
+
+        asyncio.get_running_loop().remove_reader(self._socket.fileno())
+        self._socket.close()
+        self._socket = None
+        self._unlink(self._path)
+
+    def send(self, payload):
+        data = payload.encode()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path == self._path or not name.endswith(".sock"):
+                continue
+            try:
+                self._socket.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._unlink(path)
+            except BlockingIOError:
+                # The receiver's buffer is full; like a NOTIFY queue overflow, that worker misses this one.
+                self.dropped += 1
+
+    def _read(self, bus):
+        while True:
+            try:
+                payload = self._socket.recv(65536)
+            except BlockingIOError:
+                return
+            bus.receive(payload.decode())
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class PostgresBackend:
+    # One dedicated connection per worker LISTENs on the channel and also carries our NOTIFYs. When it drops,
+    # notifications may have been missed, so subscribers are reset once it is back.
+    def __init__(self, dsn, channel, keepalive_seconds=30.0, max_pending=10000):
+        self.dsn = dsn
+        self.channel = channel
+        self.keepalive_seconds = keepalive_seconds
+        self._pending = asyncio.Queue(maxsize=max_pending)
+        self._task = None
+        self.dropped = 0
+
+    async def start(self, bus):
+        self._task = asyncio.create_task(self._run(bus))
+
+    async def stop(self, bus):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def send(self, payload):
+        try:
+            self._pending.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self, bus):
+        import asyncpg
+
+        connected_before = False
+        payload = None
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError):
+                logger.warning("Invalidation listener could not connect; retrying", exc_info=True)
+                await asyncio.sleep(1)
+                continue
+
+            try:
+                await conn.add_listener(self.channel, lambda connection, pid, channel, message: bus.receive(message))
+                if connected_before:
+                    bus.reset()
+                connected_before = True
+
+                while True:
+                    if payload is None:
+                        try:
+                            payload = await asyncio.wait_for(self._pending.get(), timeout=self.keepalive_seconds)
+                        except TimeoutError:
+                            # An idle connection only notices it is gone when used.
+                            await conn.execute("SELECT 1")
+                            continue
+                    await conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                    payload = None
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                logger.warning("Invalidation listener lost its connection; reconnecting", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                conn.terminate()
+
+
+class InvalidationBus:
+    # Entity-level invalidations between workers and hosts. A writer updates its own caches directly and publishes
+    # the topic ("menu", "location", ...) and ids it touched; every other process runs the subscribers for that topic,
+    # which evict or reload exactly those entries. Messages from this process are ignored on receipt.
+    def __init__(self, backend):
+        self.backend = backend
+        self.origin = uuid4().hex
+        self.node = socket.gethostname()
+        self._handlers = defaultdict(list)
+        self._reset_handlers = []
+        self._tasks = set()
+        self.started = False
+        self.published = 0
+        self.received = 0
+        self.resets = 0
+
+    def subscribe(self, topic, handler, reset=None):
+        self._handlers[topic].append(handler)
+        if reset is not None:
+            self._reset_handlers.append(reset)
+
+    async def start(self):
+        await self.backend.start(self)
+        self.started = True
+
+    async def stop(self):
+        self.started = False
+        await self.backend.stop(self)
+        for task in list(self._tasks):
+            task.cancel()
+
+    def publish(self, topic, *ids):
+        # Before start() nobody is listening on our behalf (CLI tools, scripts); there is nothing to tell.
+        ids = sorted({entity_id for entity_id in ids if entity_id is not None})
+        if not ids or not self.started:
+            return
+
+        for chunk in batched(ids, MAX_IDS_PER_MESSAGE):
+            message = {"id": uuid4().hex, "topic": topic, "ids": chunk, "origin": self.origin, "node": self.node}
+            self.backend.send(to_json(message).decode())
+            self.published += 1
+
+    def receive(self, payload):
+        message = from_json(payload)
+        if message["origin"] == self.origin:
+            return
+
+        self.received += 1
+        invalidation = Invalidation(
+            id=message["id"], topic=message["topic"], ids=tuple(message["ids"]), origin=message["origin"], node=message["node"]
+        )
+        for handler in self._handlers.get(invalidation.topic, []):
+            self._spawn(handler(invalidation))
+
+    def reset(self):
+        self.resets += 1
+        for handler in self._reset_handlers:
+            self._spawn(handler())
+
+    def _spawn(self, coroutine):
+        task = asyncio.get_running_loop().create_task(self._run_handler(coroutine))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _run_handler(coroutine):
+        try:
+            await coroutine
+        except Exception:
+            logger.exception("Invalidation handler failed")
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "received": self.received,
+            "resets": self.resets,
+            "dropped": getattr(self.backend, "dropped", 0),
+        }
+
+
+def make_backend():
+    backend = settings.INVALIDATION_BACKEND
+    if backend == "auto":
+        backend = "local" if settings.DEBUG else "postgres"
+
+    if backend == "postgres":
+        return PostgresBackend(settings.POSTGRES_URL, settings.INVALIDATION_CHANNEL)
+    if backend == "local":
+        # Workers serving the same database find each other without configuration.
+        directory = settings.INVALIDATION_SOCKET_DIR or os.path.join(
+            tempfile.gettempdir(), "oo-invalidation-" + hashlib.blake2b(settings.DATABASE_URL.encode(), digest_size=8).hexdigest()
+        )
+        return UnixSocketBackend(directory)
+    return MemoryBackend()
+
+
+invalidation_bus = InvalidationBus(make_backend())
@@ -1,20 +1,107 @@
+import atexit
+import json
 import logging
+import logging.config
+import logging.handlers
+import queue
+import random
+from datetime import datetime, timezone
+
+from app.core.config import settings
+
+
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        # Anything passed through `extra=` rides along as top-level keys.
+        payload.update({key: value for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES})
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    # Keeps a fraction of records per logger-name prefix (longest prefix wins); everything else passes untouched.
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = sorted((rates or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record):
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    # The event loop only ever does a non-blocking put; when the listener falls behind, records are dropped and counted
+    # instead of stalling requests.
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
 
 
 LOGGING_CONFIG = {
     "version": 1,
     "disable_existing_loggers": False,
 
-    "formatters": {"default": {"format": "-----> %(asctime)s | %(levelname)s | %(name)s | %(message)s"}},
+    "formatters": {
+        "json": {"()": JsonFormatter},
+        "default": {"format": "-----> %(asctime)s | %(levelname)s | %(name)s | %(message)s"},
+    },
 
-    "handlers": {"console": {"class": "logging.StreamHandler", "formatter": "default"}},
+    "filters": {"sampling": {"()": SamplingFilter, "rates": settings.LOG_SAMPLE_RATES}},
+
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "json" if settings.LOG_JSON else "default"},
+        "queue": {
+            "class": "app.core.logging.DroppingQueueHandler",
+            "queue": {"()": "queue.Queue", "maxsize": settings.LOG_QUEUE_SIZE},
+            "handlers": ["console"],
+            "filters": ["sampling"],
+            "respect_handler_level": True,
+        },
+    },
 
     "loggers": {
-        "": {"handlers": ["console"], "level": "INFO"},
-        "app": {"handlers": ["console"], "level": "INFO", "propagate": False},
+        "": {"handlers": ["queue"], "level": settings.LOG_LEVEL},
+        "app": {"handlers": ["queue"], "level": settings.LOG_LEVEL, "propagate": False},
+        "sqlalchemy.engine": {"level": "INFO" if settings.SQL_ECHO else "WARNING"},
+        # uvicorn configures these (synchronous stream handlers, no propagation) before it imports the app; naming them
+        # here swaps their handlers for the queue and leaves the levels set by --log-level alone.
+        "uvicorn": {"handlers": ["queue"], "propagate": False},
+        "uvicorn.error": {"handlers": ["queue"], "propagate": False},
+        "uvicorn.access": {"handlers": ["queue"], "propagate": False},
     }
 }
 
 
 def setup_logging():
     logging.config.dictConfig(LOGGING_CONFIG)
+
+    listener = logging.getHandlerByName("queue").listener
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
+
+
+def logging_stats():
+    handler = logging.getHandlerByName("queue")
+    return {
+        "queue_depth": handler.queue.qsize() if handler else 0,
+        "dropped": DroppingQueueHandler.dropped,
+    }
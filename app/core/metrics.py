@@ -0,0 +1,152 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+
+        return lines
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Set by MetricsMiddleware for the duration of a request; engine events add to whatever stats are current.
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+class MetricsRegistry:
+    # Plain dicts and counters updated from the event loop thread only, rendered on demand in the Prometheus text
+    # format. Labels are route templates, never raw paths, so cardinality stays bounded by the route table.
+    def __init__(self):
+        self.request_latency: dict[tuple[str, str], Histogram] = {}
+        self.request_queries: dict[tuple[str, str], Histogram] = {}
+        self.request_db_seconds: dict[tuple[str, str], float] = {}
+        self.responses: dict[tuple[str, str, int], int] = {}
+        self.pool_wait: dict[str, Histogram] = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.gauges = {}
+
+    def observe_request(self, method, route, status, seconds, stats):
+        key = (method, route)
+        if key not in self.request_latency:
+            self.request_latency[key] = Histogram(LATENCY_BUCKETS)
+            self.request_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+            self.request_db_seconds[key] = 0.0
+
+        self.request_latency[key].observe(seconds)
+        self.request_queries[key].observe(stats.queries)
+        self.request_db_seconds[key] += stats.db_seconds
+        self.responses[(method, route, status)] = self.responses.get((method, route, status), 0) + 1
+
+    def observe_query(self, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+
+    def observe_pool_wait(self, pool_name, seconds):
+        if pool_name not in self.pool_wait:
+            self.pool_wait[pool_name] = Histogram(LATENCY_BUCKETS)
+        self.pool_wait[pool_name].observe(seconds)
+
+    def register_gauges(self, name, collect):
+        # `collect` returns {metric name: value}; called at scrape time only.
+        self.gauges[name] = collect
+
+    def instrument_engine(self, async_engine, name):
+        sync_engine = async_engine.sync_engine
+        sync_engine.pool.metrics_name = name
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.observe_query(time.perf_counter() - conn.info["query_started"].pop())
+
+        @event.listens_for(sync_engine, "handle_error")
+        def handle_error(exception_context):
+            started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+            if started:
+                self.observe_query(time.perf_counter() - started.pop())
+
+    def render(self):
+        lines = [
+            "# TYPE oo_http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.request_latency.items()):
+            lines.extend(histogram.render("oo_http_request_duration_seconds", {"method": method, "route": route}))
+
+        lines.append("# TYPE oo_http_responses_total counter")
+        for (method, route, status), count in sorted(self.responses.items()):
+            lines.append(f"oo_http_responses_total{_labels({'method': method, 'route': route, 'status': status})} {count}")
+
+        lines.append("# TYPE oo_http_request_db_queries histogram")
+        for (method, route), histogram in sorted(self.request_queries.items()):
+            lines.extend(histogram.render("oo_http_request_db_queries", {"method": method, "route": route}))
+
+        lines.append("# TYPE oo_http_request_db_seconds_total counter")
+        for (method, route), seconds in sorted(self.request_db_seconds.items()):
+            lines.append(f"oo_http_request_db_seconds_total{_labels({'method': method, 'route': route})} {seconds}")
+
+        lines.append("# TYPE oo_db_queries_total counter")
+        lines.append(f"oo_db_queries_total {self.queries}")
+        lines.append("# TYPE oo_db_seconds_total counter")
+        lines.append(f"oo_db_seconds_total {self.db_seconds}")
+
+        lines.append("# TYPE oo_db_pool_wait_seconds histogram")
+        for pool_name, histogram in sorted(self.pool_wait.items()):
+            lines.extend(histogram.render("oo_db_pool_wait_seconds", {"pool": pool_name}))
+
+        for name, collect in sorted(self.gauges.items()):
+            for metric, value in collect().items():
+                lines.append(f"# TYPE oo_{name}_{metric} gauge")
+                lines.append(f"oo_{name}_{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
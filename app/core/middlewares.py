@@ -1 +1,77 @@
+import time
 
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.database_async import READ_YOUR_WRITES_COOKIE, mark_recent_write
+from app.core.metrics import RequestStats, current_request_stats, metrics
+
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
+        async def send_wrapper(message):
+            # Pin the client to the primary for a short window, both in this worker and (via cookie) in any other.
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                mark_recent_write(request)
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={max(1, round(settings.READ_YOUR_WRITES_SECONDS))}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def route_label(scope):
+    route = scope.get("route")
+    if route is not None:
+        # Depending on the FastAPI version, an included router's route path may or may not carry its prefix;
+        # take whatever precedes the template's segments from the concrete path.
+        prefix = "/".join(scope["path"].split("/")[: -route.path.count("/")])
+        return prefix + route.path
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return endpoint.__name__
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Streaming responses are timed to their last chunk, since the body is sent inside self.app.
+            metrics.observe_request(scope["method"], route_label(scope), status, time.perf_counter() - started, stats)
+            current_request_stats.reset(token)
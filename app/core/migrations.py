@@ -0,0 +1,137 @@
+import argparse
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, insert, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.core.database import get_engine
+from app.core.hashing import pwd_context
+from app.onlineordering.models import Location, DeliveryZone
+from app.user.models import Role, OoUserModel as User
+
+
+logger = logging.getLogger(__name__)
+
+# Kept out of SQLModel.metadata so create_all never touches it.
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def _initial_schema(conn):
+    SQLModel.metadata.create_all(conn)
+
+
+def _location_opening_intervals(conn):
+    # Databases created by version 1 before this column existed; fresh ones already have it.
+    columns = {column["name"] for column in inspect(conn).get_columns(Location.__tablename__)}
+    if "opening_intervals" not in columns:
+        conn.execute(text(f"ALTER TABLE {Location.__tablename__} ADD COLUMN opening_intervals JSON"))
+
+
+def _delivery_zones(conn):
+    DeliveryZone.__table__.create(conn, checkfirst=True)
+
+
+def _bootstrap_admin(conn):
+    if conn.execute(select(User.id).where(User.role == Role.SuperAdmin).limit(1)).first() is None:
+        conn.execute(
+            insert(User).values(
+                username="admin",
+                email="admin@example.com",
+                hashed_password=pwd_context.hash("admin"),
+                role=Role.SuperAdmin,
+            )
+        )
+
+
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "location opening intervals", _location_opening_intervals),
+    (3, "delivery zones", _delivery_zones),
+    (4, "bootstrap SuperAdmin", _bootstrap_admin),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+# Arbitrary key for pg_advisory_xact_lock, shared by every process upgrading the same database.
+MIGRATION_LOCK_ID = 0x6F6F6D6967
+
+
+def current_version(conn):
+    try:
+        return conn.execute(select(func.coalesce(func.max(schema_version.c.version), 0))).scalar_one()
+    except (OperationalError, ProgrammingError):
+        conn.rollback()
+        return 0
+
+
+def _lock(conn):
+    # Several workers with AUTO_MIGRATE (or overlapping deploys) may upgrade at once. The lock is taken at the start of
+    # a transaction and released by its commit, so each step re-reads the version under it.
+    if conn.dialect.name == "postgresql":
+        conn.execute(select(func.pg_advisory_xact_lock(MIGRATION_LOCK_ID)))
+    elif conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def upgrade(conn):
+    # Runs on a sync connection (directly, or through AsyncConnection.run_sync); each step commits on its own.
+    conn.commit()
+    _lock(conn)
+    schema_version.create(conn, checkfirst=True)
+    conn.commit()
+
+    for number, description, migrate in MIGRATIONS:
+        _lock(conn)
+        if number <= current_version(conn):
+            conn.commit()
+            continue
+
+        logger.info("Applying migration %s: %s", number, description)
+        migrate(conn)
+        conn.execute(insert(schema_version).values(version=number, description=description, applied_at=datetime.now(timezone.utc)))
+        conn.commit()
+
+    return current_version(conn)
+
+
+async def ensure_schema(async_engine):
+    # The only startup work against the database: one indexed MAX() on a tiny table.
+    async with async_engine.connect() as conn:
+        version = await conn.run_sync(current_version)
+        if version == LATEST_VERSION:
+            return version
+
+        if version > LATEST_VERSION:
+            raise RuntimeError(f"Database schema version {version} is newer than this build ({LATEST_VERSION}).")
+        if not settings.AUTO_MIGRATE:
+            raise RuntimeError(
+                f"Database schema is at version {version}, this build needs {LATEST_VERSION}. Run `python -m app.core.migrations upgrade`."
+            )
+
+        return await conn.run_sync(upgrade)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the database schema version.")
+    parser.add_argument("command", choices=["upgrade", "current"])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with get_engine().connect() as conn:
+        if args.command == "upgrade":
+            version = upgrade(conn)
+        else:
+            version = current_version(conn)
+
+    print(f"Schema version {version} (latest {LATEST_VERSION}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@dataclass
+class QueryTrace:
+    name: str
+    budget: int
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def total(self):
+        return sum(self.statements.values())
+
+    def problems(self):
+        problems = []
+        if self.total > self.budget:
+            problems.append(f"{self.total} queries, budget is {self.budget}")
+        for statement, count in self.statements.items():
+            # The same SQL over and over within one call is the signature of a lazy load per row.
+            if count >= settings.QUERY_REPEAT_THRESHOLD:
+                problems.append(f"{count}x repeated: {' '.join(statement.split())[:200]}")
+
+        return problems
+
+
+# Traces of every budgeted call currently on the stack; a statement counts towards all of them.
+_active_traces: ContextVar[tuple[QueryTrace, ...]] = ContextVar("active_query_traces", default=())
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for trace in _active_traces.get():
+        trace.statements[statement] += 1
+
+
+def instrument_engine(async_engine):
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _record_statement)
+
+
+def query_budget(max_queries):
+    # Declares how many statements a service call may issue. Only enforced when QUERY_BUDGET_MODE is "warn" or
+    # "raise" (debug and test runs); otherwise the method is returned untouched.
+    def decorator(func):
+        if settings.QUERY_BUDGET_MODE == "off":
+            return func
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            trace = QueryTrace(name=func.__qualname__, budget=max_queries)
+            token = _active_traces.set((*_active_traces.get(), trace))
+            try:
+                result = await func(*args, **kwargs)
+            finally:
+                _active_traces.reset(token)
+
+            problems = trace.problems()
+            if problems:
+                message = f"{trace.name}: " + "; ".join(problems)
+                if settings.QUERY_BUDGET_MODE == "raise":
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+
+            return result
+
+        return wrapper
+
+    return decorator
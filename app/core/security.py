@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
@@ -5,18 +6,18 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import Depends, APIRouter, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt.exceptions import InvalidTokenError
-from passlib.context import CryptContext
 from sqlmodel import select
 from pydantic import BaseModel
 import jwt
 
-from app.user.models import OoUserModel as User
+from app.user.models import Role, OoUserModel as User
 from app.core.database_async import get_session
 from app.core.config import settings
+from app.core.utils import TTLCache
+from app.core.hashing import password_hasher
+from app.core.invalidation import invalidation_bus
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 core_router = APIRouter()
@@ -31,12 +32,40 @@ class TokenData(BaseModel):
     username: str | None = None
 
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    role: Role
+
+
+# Resolved principals keyed by bearer token, so authenticated requests skip the user lookup in steady state.
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal(user_id: int):
+    principal_cache.discard_where(lambda principal: principal.id == user_id)
+    invalidation_bus.publish("user", user_id)
+
+
+async def _evict_principals(invalidation):
+    user_ids = set(invalidation.ids)
+    principal_cache.discard_where(lambda principal: principal.id in user_ids)
+
+
+async def _reset_principals():
+    principal_cache.clear()
 
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+invalidation_bus.subscribe("user", _evict_principals, reset=_reset_principals)
+
+
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
 
 
 async def get_user(username: str, session: AsyncSession):
@@ -52,7 +81,7 @@ async def authenticate_user(session: AsyncSession, username: str, password: str)
     user = await get_user(username, session)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return False
     return user
 
@@ -74,6 +103,10 @@ async def get_current_user(session: Annotated[AsyncSession, Depends(get_session)
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username = payload.get("sub")
@@ -85,7 +118,13 @@ async def get_current_user(session: Annotated[AsyncSession, Depends(get_session)
     user = await get_user(username=token_data.username, session=session)
     if user is None:
         raise credentials_exception
-    return user
+
+    principal = Principal(id=user.id, username=user.username, role=user.role)
+    # Never keep a principal around longer than the token itself is valid.
+    expires_in = payload["exp"] - datetime.now(timezone.utc).timestamp() if "exp" in payload else None
+    principal_cache.set(token, principal, ttl=expires_in)
+
+    return principal
 
 
 @core_router.post("/token")
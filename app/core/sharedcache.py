@@ -0,0 +1,178 @@
+import fcntl
+import glob
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+
+from pydantic_core import from_json, to_json
+
+from app.core.config import settings
+
+
+SLOT = struct.Struct("<Q")
+HEADER = struct.Struct("<Q")
+CLAIM_SLOTS = 4096
+
+
+@dataclass(frozen=True)
+class SharedBlob:
+    version: int
+    index: object
+    payload: memoryview
+
+
+class SharedCache:
+    # Host-wide cache shared by every worker process through memory-mapped files in one directory:
+    #  - a fixed table of 64-bit version counters (`versions`), keys hashed onto slots. Two keys sharing a slot only
+    #    cost each other an extra rebuild, never a stale read;
+    #  - one immutable file per (name, version) holding a JSON index and an encoded payload. A file is written once,
+    #    atomically renamed into place and never modified, so readers map it without locks and the page cache holds a
+    #    single copy no matter how many workers read it;
+    #  - a small table of recently claimed tokens (`claims`), so work every worker is told about happens once per host;
+    #  - a random generation id (`generation`) that ETags are tagged with instead of a per-process epoch. It is
+    #    re-stamped, and every blob dropped, whenever a worker attaches to a directory no live worker holds, so data
+    #    changed while the host was down (a SQL fix, the data generator) is never served from old blobs or old tags.
+    def __init__(self, directory, slots):
+        self.directory = directory
+        self.slots = slots
+        self._tables = {}
+        self._live = None
+        self._blobs: dict[str, SharedBlob] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _table(self, name, slots):
+        table = self._tables.get(name)
+        if table is None:
+            os.makedirs(self.directory, exist_ok=True)
+            fd = os.open(os.path.join(self.directory, name), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size < slots * SLOT.size:
+                    os.ftruncate(fd, slots * SLOT.size)
+                table = self._tables[name] = mmap.mmap(fd, slots * SLOT.size)
+            finally:
+                os.close(fd)
+
+        return table
+
+    def _locked(self, name):
+        lock = open(os.path.join(self.directory, name), "rb")
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def attach(self):
+        # Every worker holds a shared lock on `live` for as long as it runs; getting it exclusively means we are the
+        # first one up. Late starters block on the shared lock until the first one has finished re-stamping.
+        if self._live is not None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._live = open(os.path.join(self.directory, "live"), "ab")
+        try:
+            fcntl.flock(self._live, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            pass
+        else:
+            self._restamp()
+        fcntl.flock(self._live, fcntl.LOCK_SH)
+
+    def _restamp(self):
+        table = self._table("generation", 1)
+        with self._locked("generation"):
+            for name in self.names():
+                for path in glob.glob(glob.escape(os.path.join(self.directory, name)) + ".*"):
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+            SLOT.pack_into(table, 0, int.from_bytes(os.urandom(SLOT.size)))
+
+    def generation(self):
+        return f"{SLOT.unpack_from(self._table('generation', 1))[0]:016x}"
+
+    def version(self, key):
+        return SLOT.unpack_from(self._table("versions", self.slots), (key % self.slots) * SLOT.size)[0]
+
+    def bump(self, key):
+        table = self._table("versions", self.slots)
+        offset = (key % self.slots) * SLOT.size
+        with self._locked("versions"):
+            version = SLOT.unpack_from(table, offset)[0] + 1
+            SLOT.pack_into(table, offset, version)
+
+        return version
+
+    def claim(self, token):
+        # True for the first caller on this host with this token, False for the rest. A later token landing on the same
+        # slot can evict an older one; a straggler for that older token then repeats the work once.
+        table = self._table("claims", CLAIM_SLOTS)
+        offset = (token % CLAIM_SLOTS) * SLOT.size
+        with self._locked("claims"):
+            if SLOT.unpack_from(table, offset)[0] == token:
+                return False
+            SLOT.pack_into(table, offset, token)
+
+        return True
+
+    def get(self, name, version):
+        blob = self._blobs.get(name)
+        if blob is not None and blob.version == version:
+            self.hits += 1
+            return blob
+
+        try:
+            fd = os.open(self._path(name, version), os.O_RDONLY)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        try:
+            mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+
+        view = memoryview(mapped)
+        index_end = HEADER.size + HEADER.unpack_from(view)[0]
+        blob = SharedBlob(version=version, index=from_json(bytes(view[HEADER.size:index_end])), payload=view[index_end:])
+        # Superseded mappings are released once the last snapshot referencing them is gone.
+        self._blobs[name] = blob
+        self.hits += 1
+
+        return blob
+
+    def put(self, name, version, index, payload):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name, version)
+        encoded_index = to_json(index)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(HEADER.pack(len(encoded_index)))
+            file.write(encoded_index)
+            file.write(payload)
+        os.replace(temporary, path)
+        self.writes += 1
+
+        # Older versions are unreachable; workers that still map one keep their pages until they let go.
+        for stale in glob.glob(glob.escape(os.path.join(self.directory, name)) + ".*"):
+            if stale != path and not stale.endswith(".tmp"):
+                try:
+                    os.unlink(stale)
+                except FileNotFoundError:
+                    pass
+
+        return self.get(name, version)
+
+    def names(self):
+        paths = glob.glob(os.path.join(glob.escape(self.directory), "*.*"))
+        return {os.path.basename(path).rsplit(".", 1)[0] for path in paths if not path.endswith(".tmp")}
+
+    def _path(self, name, version):
+        return os.path.join(self.directory, f"{name}.{version}")
+
+    def stats(self):
+        return {"mapped": len(self._blobs), "hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+
+shared_catalog = SharedCache(settings.SHARED_CACHE_DIR, settings.SHARED_CACHE_VERSION_SLOTS) if settings.SHARED_CACHE_DIR else None
@@ -0,0 +1,92 @@
+import asyncio
+import inspect
+from functools import wraps
+
+from app.core.config import settings
+from app.core.database_async import reading_own_writes
+
+
+class SingleFlight:
+    # Concurrent calls with the same key share one execution: the first caller (the leader) runs it, everyone else
+    # awaits its outcome, result or exception. Nothing is kept once it finishes; a follower sees what the leader read,
+    # which may predate a commit made while the leader was running, so callers must opt out where that matters.
+    def __init__(self):
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key, call):
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+
+            self.followers += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled (client went away); unless we were too, take over.
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved so a leader without followers does not log "exception was never retrieved".
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = future
+        self.leaders += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self):
+        return {"in_flight": len(self._inflight), "leaders": self.leaders, "followers": self.followers}
+
+
+flights = SingleFlight()
+
+
+def _key_part(name, value):
+    # Reads authorize on the caller's role only, so callers with the same role can share a result. Sessions share by
+    # database: a primary reader must never be answered from a replica read.
+    if name == "current_user":
+        return name, value.role
+    if name == "session":
+        return name, value.bind
+    return name, value
+
+
+def single_flight(func):
+    # Coalesces concurrent identical calls of a read method, keyed by the method and its arguments. `self` is not
+    # part of the key, and the leader's session runs the shared execution. Requests pinned to the primary to read
+    # their own writes always run on their own: a leader that started before their commit would hand back old data.
+    if not settings.SINGLE_FLIGHT_READS:
+        return func
+
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        if reading_own_writes.get():
+            return await func(*args, **kwargs)
+
+        arguments = signature.bind(*args, **kwargs).arguments
+        key = (func.__qualname__, *(_key_part(name, value) for name, value in arguments.items() if name != "self"))
+        try:
+            hash(key)
+        except TypeError:
+            return await func(*args, **kwargs)
+
+        return await flights.do(key, lambda: func(*args, **kwargs))
+
+    return wrapper
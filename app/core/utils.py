@@ -0,0 +1,138 @@
+import base64
+import bisect
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.sharedcache import shared_catalog
+
+
+# Revisions are in-process counters, so tag every ETag with the process that issued it; with a shared cache they are
+# host-wide, and so is the generation they are tagged with.
+ETAG_EPOCH = uuid4().hex
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def make_etag(*parts):
+    epoch = ETAG_EPOCH if shared_catalog is None else shared_catalog.generation()
+    key = ":".join(str(part) for part in (epoch, *parts))
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str | None):
+    if etag is None:
+        return False
+
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str):
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+class JSONBytesResponse(Response):
+    media_type = "application/json"
+
+
+def json_bytes_response(content: bytes, etag: str | None = None, next_cursor: str | None = None):
+    headers = {}
+    if etag is not None:
+        headers["ETag"] = etag
+    if next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return JSONBytesResponse(content, headers=headers)
+
+
+def encode_cursor(last_id: int):
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None):
+    if cursor is None:
+        return None
+
+    try:
+        last_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))["id"]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    return last_id
+
+
+def next_cursor(rows, limit: int):
+    if len(rows) < limit or not rows:
+        return None
+
+    last = rows[-1]
+    return encode_cursor(last["id"] if isinstance(last, dict) else last.id)
+
+
+def set_next_cursor(response: Response, rows, limit: int):
+    cursor = next_cursor(rows, limit)
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+
+def page_rows(rows, offset: int, limit: int, cursor: str | None = None):
+    # `rows` must be sorted by id; a cursor takes precedence over the offset.
+    after_id = decode_cursor(cursor)
+    start = offset if after_id is None else bisect.bisect_right(rows, after_id, key=lambda row: row["id"])
+
+    return rows[start : start + limit]
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def discard_where(self, predicate):
+        for key in [key for key, (value, _) in self._data.items() if predicate(value)]:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -1,37 +1,56 @@
+import logging
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from sqlmodel import select
-
-from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.user.router import user_router
-from app.user.models import Role, OoUserModel as User
+from app.onlineordering.router import oo_router
 from app.core.config import settings
-from app.core.security import core_router, get_password_hash
-from app.core.database_async import init_db, AsyncSessionLocal
+from app.core.security import core_router
+from app.core.hashing import password_hasher
+from app.core.database_async import get_engine, get_read_engine, has_replica, pool_stats
+from app.core.migrations import ensure_schema
+from app.core.middlewares import ReadYourWritesMiddleware, MetricsMiddleware, route_label
+from app.core.compression import PrecompressedResponseMiddleware, compressed_responses
+from app.core.metrics import metrics
+from app.core.logging import setup_logging, logging_stats
+from app.core.invalidation import invalidation_bus
+from app.core.singleflight import flights
+from app.core.sharedcache import shared_catalog
+
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+IMPORTED_AT = time.perf_counter()
+startup_timings = {}
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
-
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(User).where(User.role == "SuperAdmin"))
-        existing = result.scalar_one_or_none()
-
-        if not existing:
-            admin = User(
-                username="admin",
-                email="admin@example.com",
-                hashed_password=get_password_hash("admin"),
-                role=Role.SuperAdmin,
-            )
-            session.add(admin)
-            await session.commit()
+    # Schema creation and the admin bootstrap live in `python -m app.core.migrations upgrade`; a worker only checks
+    # that the schema version matches.
+    started = time.perf_counter()
+    await ensure_schema(get_engine())
+    if shared_catalog is not None:
+        shared_catalog.attach()
+    startup_timings["schema_check_seconds"] = time.perf_counter() - started
+    startup_timings["startup_seconds"] = time.perf_counter() - IMPORTED_AT
+    logger.info(
+        "Startup completed in %.1f ms (schema check %.1f ms)",
+        startup_timings["startup_seconds"] * 1000,
+        startup_timings["schema_check_seconds"] * 1000,
+    )
+
+    await invalidation_bus.start()
 
     yield
 
+    await invalidation_bus.stop()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -39,12 +58,32 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=500)
+app.add_middleware(PrecompressedResponseMiddleware, minimum_size=500, route_label=route_label)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+metrics.register_gauges("db_pool_primary", lambda: pool_stats(get_engine()))
+if has_replica():
+    metrics.register_gauges("db_pool_replica", lambda: pool_stats(get_read_engine()))
+metrics.register_gauges("password_hash", password_hasher.stats)
+metrics.register_gauges("startup", lambda: startup_timings)
+metrics.register_gauges("logging", logging_stats)
+metrics.register_gauges("compressed_responses", compressed_responses.stats)
+metrics.register_gauges("invalidation", invalidation_bus.stats)
+metrics.register_gauges("single_flight", flights.stats)
+if shared_catalog is not None:
+    metrics.register_gauges("shared_catalog", shared_catalog.stats)
 
 app.include_router(user_router, prefix="/users", tags=["Users"])
+app.include_router(oo_router, prefix="/online-ordering")
 app.include_router(core_router, prefix="", tags=["Security"])
 
 
 @app.get("/health", tags=["Health"])
 def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
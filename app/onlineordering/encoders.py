@@ -0,0 +1,79 @@
+from pydantic_core import to_json
+
+
+# Row -> dict builders mirroring the *Read schemas, so catalog payloads can be encoded without a validation pass.
+def option_row(option):
+    return {
+        "id": option.id,
+        "name": option.name,
+        "price": option.price,
+        "option_group_fk": option.option_group_fk,
+    }
+
+
+def option_group_row(option_group):
+    return {
+        "id": option_group.id,
+        "allow_multiple": option_group.allow_multiple,
+        "is_required": option_group.is_required,
+        "options": [option_row(option) for option in option_group.options],
+    }
+
+
+def item_row(item):
+    return {
+        "id": item.id,
+        "name": item.name,
+        "description": item.description,
+        "image": item.image,
+        "price": item.price,
+        "is_available": item.is_available,
+        "option_groups": [option_group_row(option_group) for option_group in item.option_groups],
+    }
+
+
+def category_row(category):
+    return {
+        "id": category.id,
+        "name": category.name,
+        "items": [item_row(item) for item in category.items],
+    }
+
+
+def encode(value):
+    return to_json(value)
+
+
+def encode_menu(categories):
+    # Encodes a snapshot's category tree exactly as `encode(categories)` would, while recording the byte span of every
+    # category and item, so single entities and pages can later be sliced out of the payload without decoding it.
+    parts = [b"["]
+    size = 1
+    index = []
+    for position, category in enumerate(categories):
+        if position:
+            parts.append(b",")
+            size += 1
+
+        start = size
+        head = encode({"id": category["id"], "name": category["name"]})[:-1] + b',"items":['
+        parts.append(head)
+        size += len(head)
+
+        items = []
+        for item_position, item in enumerate(category["items"]):
+            if item_position:
+                parts.append(b",")
+                size += 1
+            encoded = encode(item)
+            items.append({"id": item["id"], "span": [size, size + len(encoded)]})
+            parts.append(encoded)
+            size += len(encoded)
+
+        parts.append(b"]}")
+        size += 2
+        index.append({"id": category["id"], "span": [start, size], "items": items})
+
+    parts.append(b"]")
+
+    return b"".join(parts), index
@@ -0,0 +1,198 @@
+import asyncio
+import re
+from bisect import bisect_right
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlmodel import select
+
+from app.onlineordering.models import Location
+from app.onlineordering.spatial import location_row
+from app.core.config import settings
+from app.core.database_async import AsyncSessionLocal
+
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+HOURS_PER_WEEK = 7 * 24
+
+_RANGE = re.compile(r"^(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})$")
+
+
+def _parse_days(text):
+    text = text.strip().lower()
+    if text in ("daily", "everyday"):
+        return list(range(7))
+
+    days = []
+    for part in text.split(","):
+        bounds = [bound.strip()[:3] for bound in part.split("-")]
+        if len(bounds) not in (1, 2) or any(bound not in DAYS for bound in bounds):
+            raise ValueError(f"Unknown day {part.strip()!r}.")
+
+        start, end = DAYS.index(bounds[0]), DAYS.index(bounds[-1])
+        days.extend((start + offset) % 7 for offset in range((end - start) % 7 + 1))
+
+    return days
+
+
+def _parse_range(text):
+    match = _RANGE.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid time range {text.strip()!r}.")
+
+    start_hour, start_minute, end_hour, end_minute = map(int, match.groups())
+    if start_hour > 23 or end_hour > 24 or start_minute > 59 or end_minute > 59 or (end_hour == 24 and end_minute):
+        raise ValueError(f"Invalid time range {text.strip()!r}.")
+
+    start = start_hour * 60 + start_minute
+    end = end_hour * 60 + end_minute
+    # An end at or before the start runs past midnight into the next day.
+    return start, end if end > start else end + MINUTES_PER_DAY
+
+
+def parse_working_hours(text):
+    # "Mon-Fri 09:00-17:00, 18:00-22:00; Sat 10:00-02:00; Sun closed" -> sorted, merged [start, end) minute-of-week
+    # intervals with Monday 00:00 as minute 0.
+    intervals = []
+    for entry in filter(None, (entry.strip() for entry in text.split(";"))):
+        days, _, ranges = entry.partition(" ")
+        if not ranges.strip():
+            raise ValueError(f"Missing hours for {entry!r}.")
+        if ranges.strip().lower() == "closed":
+            _parse_days(days)
+            continue
+
+        for start, end in map(_parse_range, ranges.split(",")):
+            for day in _parse_days(days):
+                offset = day * MINUTES_PER_DAY
+                if offset + end <= MINUTES_PER_WEEK:
+                    intervals.append([offset + start, offset + end])
+                else:
+                    intervals.append([offset + start, MINUTES_PER_WEEK])
+                    intervals.append([0, offset + end - MINUTES_PER_WEEK])
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    return merged
+
+
+def minute_of_week(moment):
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def local_time(moment=None):
+    timezone = ZoneInfo(settings.LOCATION_TIMEZONE)
+    if moment is None:
+        return datetime.now(timezone)
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone)
+    return moment.astimezone(timezone)
+
+
+class OpeningHoursIndex:
+    # Compiled weekly intervals of active locations, bucketed by hour of the week. Locations open for a whole hour
+    # are answered from the bucket directly; only those opening or closing inside it are bisected.
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+        self._rows: dict[int, dict] = {}
+        self._starts: dict[int, list[int]] = {}
+        self._ends: dict[int, list[int]] = {}
+        self._full = [set() for _ in range(HOURS_PER_WEEK)]
+        self._partial = [set() for _ in range(HOURS_PER_WEEK)]
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def upsert(self, location):
+        if not self._loaded:
+            return
+
+        self.remove(location.id)
+        if not location.is_active:
+            return
+
+        intervals = location.opening_intervals
+        if intervals is None and location.working_hours:
+            # Rows written before hours were compiled on save; anything unparseable is treated as never open.
+            try:
+                intervals = parse_working_hours(location.working_hours)
+            except ValueError:
+                intervals = None
+        if not intervals:
+            return
+
+        self._rows[location.id] = location_row(location)
+        self._starts[location.id] = [start for start, _ in intervals]
+        self._ends[location.id] = [end for _, end in intervals]
+        for start, end in intervals:
+            for hour in range(start // 60, (end + 59) // 60):
+                if start <= hour * 60 and (hour + 1) * 60 <= end:
+                    self._full[hour].add(location.id)
+                else:
+                    self._partial[hour].add(location.id)
+
+    def remove(self, location_id):
+        if self._rows.pop(location_id, None) is None:
+            return
+
+        self._starts.pop(location_id)
+        self._ends.pop(location_id)
+        for bucket in (*self._full, *self._partial):
+            bucket.discard(location_id)
+
+    def clear(self):
+        self._rows.clear()
+        self._starts.clear()
+        self._ends.clear()
+        for bucket in (*self._full, *self._partial):
+            bucket.clear()
+        self._loaded = False
+
+    async def is_open(self, location_id, moment=None):
+        await self._ensure_loaded()
+
+        if location_id not in self._rows:
+            return False
+
+        return self._contains(location_id, minute_of_week(local_time(moment)))
+
+    async def open_locations(self, moment=None):
+        await self._ensure_loaded()
+
+        minute = minute_of_week(local_time(moment))
+        hour = minute // 60
+        location_ids = self._full[hour] | {
+            location_id for location_id in self._partial[hour] if self._contains(location_id, minute)
+        }
+
+        return [self._rows[location_id] for location_id in sorted(location_ids)]
+
+    def _contains(self, location_id, minute):
+        position = bisect_right(self._starts[location_id], minute) - 1
+        return position >= 0 and minute < self._ends[location_id][position]
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+
+        async with self._lock:
+            if self._loaded:
+                return
+
+            async with self.session_factory() as session:
+                result = await session.exec(select(Location).where(Location.is_active))
+                locations = result.all()
+
+            self._loaded = True
+            for location in locations:
+                self.upsert(location)
+
+
+opening_hours_index = OpeningHoursIndex(AsyncSessionLocal)
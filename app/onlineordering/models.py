@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlmodel import SQLModel, Field, Column, Relationship, Enum as sqlEnum
+from sqlmodel import SQLModel, Field, Column, Relationship, JSON, Enum as sqlEnum
 
 if TYPE_CHECKING:
     from app.user.models import OoUserModel
@@ -45,6 +45,8 @@ class Location(SQLModel, table=True):
     name: str
     address: str
     working_hours: str | None = None
+    # working_hours compiled on save into sorted [start, end) minute-of-week intervals, Monday 00:00 = 0.
+    opening_intervals: list[list[int]] | None = Field(default=None, sa_column=Column(JSON))
     is_active: bool = True
 
     user_fk: int | None = Field(foreign_key="oousermodel.id")
@@ -52,8 +54,20 @@ class Location(SQLModel, table=True):
 
     menu: "Menu" = Relationship(back_populates="locations")
     user: "OoUserModel" = Relationship(back_populates="locations")
+    delivery_zones: list["DeliveryZone"] = Relationship(back_populates="location")
 
 
+class DeliveryZone(SQLModel, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+
+    name: str
+    # Closed ring of [latitude, longitude] vertices; the last vertex connects back to the first.
+    polygon: list[list[float]] = Field(sa_column=Column(JSON, nullable=False))
+
+    location_fk: int = Field(foreign_key="location.id", index=True)
+
+    location: "Location" = Relationship(back_populates="delivery_zones")
+
 
 class Category(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
@@ -63,7 +77,7 @@ class Category(SQLModel, table=True):
     menu_fk: int = Field(foreign_key="menu.id")
 
     menu: "Menu" = Relationship(back_populates="categories")
-    items: list["Item"] = Relationship(back_populates="category")
+    items: list["Item"] = Relationship(back_populates="category", sa_relationship_kwargs={"order_by": "Item.id"})
 
 
 class Item(SQLModel, table=True):
@@ -78,7 +92,7 @@ class Item(SQLModel, table=True):
     category_fk: int = Field(foreign_key="category.id")
 
     category: "Category" = Relationship(back_populates="items")
-    option_groups: list["OptionGroup"] = Relationship(back_populates="item")
+    option_groups: list["OptionGroup"] = Relationship(back_populates="item", sa_relationship_kwargs={"order_by": "OptionGroup.id"})
 
 
 class OptionGroup(SQLModel, table=True):
@@ -90,7 +104,7 @@ class OptionGroup(SQLModel, table=True):
     item_fk: int = Field(foreign_key="item.id")
 
     item: "Item" = Relationship(back_populates="option_groups")
-    options: list["Option"] = Relationship(back_populates="option_group")
+    options: list["Option"] = Relationship(back_populates="option_group", sa_relationship_kwargs={"order_by": "Option.id"})
 
 
 class Option(SQLModel, table=True):
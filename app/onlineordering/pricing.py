@@ -0,0 +1,181 @@
+from array import array
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+
+from app.core.singleflight import flights
+from app.onlineordering.snapshot import menu_snapshots
+
+
+def _positions(rows):
+    # Ids are global serials, so one menu's ids can be spread across the whole table; the arrays below hold rows in
+    # order and this maps each id to its row's position.
+    return {row["id"]: position for position, row in enumerate(rows)}
+
+
+@dataclass(frozen=True)
+class OptionRules:
+    # One item's option-group rules. Groups are numbered by their position on the item: bit n of a selection mask
+    # is group n, and max_select[n] caps how many of its options a line may pick.
+    group_ids: tuple[int, ...]
+    required_mask: int
+    max_select: tuple[int, ...]
+
+    @classmethod
+    def build(cls, item):
+        option_groups = item["option_groups"]
+
+        return cls(
+            group_ids=tuple(option_group["id"] for option_group in option_groups),
+            required_mask=sum(
+                1 << position for position, option_group in enumerate(option_groups) if option_group["is_required"]
+            ),
+            max_select=tuple(
+                len(option_group["options"]) if option_group["allow_multiple"] else 1 for option_group in option_groups
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class PriceTable:
+    menu_id: int
+    version: int
+    item_offsets: dict[int, int]
+    item_prices: array
+    item_available: array
+    option_offsets: dict[int, int]
+    option_prices: array
+    option_items: array
+    option_positions: array
+    option_rules: dict[int, OptionRules]
+
+    @classmethod
+    def build(cls, snapshot):
+        items = list(snapshot.item_index.values())
+        options = [
+            {**option, "item_id": item["id"], "position": position}
+            for item in items
+            for position, option_group in enumerate(item["option_groups"])
+            for option in option_group["options"]
+        ]
+
+        return cls(
+            menu_id=snapshot.menu_id,
+            version=snapshot.version,
+            item_offsets=_positions(items),
+            item_prices=array("d", [item["price"] for item in items]),
+            item_available=array("b", [int(item["is_available"]) for item in items]),
+            option_offsets=_positions(options),
+            option_prices=array("d", [option["price"] for option in options]),
+            option_items=array("q", [option["item_id"] for option in options]),
+            option_positions=array("l", [option["position"] for option in options]),
+            option_rules={item["id"]: OptionRules.build(item) for item in items},
+        )
+
+    def item_index(self, item_id):
+        index = self.item_offsets.get(item_id)
+        if index is None:
+            raise HTTPException(status_code=404, detail=f"Item {item_id} not found in menu {self.menu_id}.")
+        if not self.item_available[index]:
+            raise HTTPException(status_code=400, detail=f"Item {item_id} is not available.")
+
+        return index
+
+    def option_index(self, item_id, option_id):
+        index = self.option_offsets.get(option_id)
+        if index is None or self.option_items[index] != item_id:
+            raise HTTPException(status_code=400, detail=f"Option {option_id} does not belong to item {item_id}.")
+
+        return index
+
+    def validate_line(self, line):
+        # O(selections): one position lookup per selected option, then a single mask test for required groups.
+        rules = self.option_rules[line.item_id]
+        option_indexes = [self.option_index(line.item_id, option_id) for option_id in line.option_ids]
+
+        if len(set(line.option_ids)) != len(line.option_ids):
+            raise HTTPException(status_code=400, detail=f"Item {line.item_id} has an option selected more than once.")
+
+        selected_mask = 0
+        counts = {}
+        for option_index in option_indexes:
+            position = self.option_positions[option_index]
+            counts[position] = counts.get(position, 0) + 1
+            if counts[position] > rules.max_select[position]:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Option Group {rules.group_ids[position]} of item {line.item_id} allows at most "
+                    f"{rules.max_select[position]} selection(s).",
+                )
+            selected_mask |= 1 << position
+
+        missing_mask = rules.required_mask & ~selected_mask
+        if missing_mask:
+            position = (missing_mask & -missing_mask).bit_length() - 1
+            raise HTTPException(
+                status_code=400,
+                detail=f"Option Group {rules.group_ids[position]} of item {line.item_id} is required.",
+            )
+
+        return option_indexes
+
+    def price(self, lines):
+        item_prices = self.item_prices
+        option_prices = self.option_prices
+
+        priced = []
+        for line in lines:
+            item_index = self.item_index(line.item_id)
+            unit_price = item_prices[item_index] + sum(
+                option_prices[option_index] for option_index in self.validate_line(line)
+            )
+            priced.append(
+                {
+                    "item_id": line.item_id,
+                    "option_ids": line.option_ids,
+                    "quantity": line.quantity,
+                    "unit_price": round(unit_price, 2),
+                    "line_total": round(unit_price * line.quantity, 2),
+                }
+            )
+
+        return {
+            "menu_id": self.menu_id,
+            "lines": priced,
+            "total": round(sum(line["line_total"] for line in priced), 2),
+        }
+
+
+class PriceTableStore:
+    # Price tables and option rules are derived from menu snapshots and share their version, so any menu edit that
+    # bumps the snapshot (every Option / Option Group / Item mutation does) also retires the table. Pricing or
+    # validating a cart against a warm table never reaches the database.
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+        self._tables: dict[int, PriceTable] = {}
+
+    def clear(self):
+        self._tables.clear()
+
+    async def get(self, menu_id):
+        table = self._tables.get(menu_id)
+        if table is not None and table.version == self.snapshots.version(menu_id):
+            return table
+
+        key = ("PriceTableStore.get", id(self), menu_id)
+        table = await flights.do(key, lambda: self._load(menu_id))
+        if table.version != self.snapshots.version(menu_id):
+            # Joined a build that started before the latest edit; the next one starts after it.
+            table = await flights.do(key, lambda: self._load(menu_id))
+
+        return table
+
+    async def _load(self, menu_id):
+        table = PriceTable.build(await self.snapshots.get(menu_id))
+        if table.version == self.snapshots.version(menu_id):
+            self._tables[menu_id] = table
+
+        return table
+
+
+price_tables = PriceTableStore(menu_snapshots)
@@ -1,28 +1,64 @@
+from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.user.schemas import UserRead
-from app.onlineordering.services import OptionServices, OptionGroupService, ItemServices
+from app.onlineordering.services import (
+    MenuServices,
+    LocationServices,
+    OptionServices,
+    OptionGroupServices,
+    ItemServices,
+    CategoryServices,
+    CartServices,
+)
 from app.onlineordering.schemas import (
     OptionRead,
     OptionCreate,
     OptionPatch,
+    OptionBulkPatch,
     OptionGroupRead,
     OptionGroupCreate,
+    OptionGroupNestedCreate,
     OptionGroupPatch,
+    OptionGroupBulkPatch,
     ItemRead,
     ItemPatch,
+    ItemBulkPatch,
     ItemCreate,
+    ItemNestedCreate,
     CategoryRead,
     CategoryCreate,
     CategoryPatch,
+    MenuImportResult,
+    LocationRead,
+    LocationNearby,
+    LocationOpenStatus,
+    LocationCreate,
+    LocationPatch,
+    DeliveryZoneRead,
+    DeliveryZoneCreate,
+    DeliveryZoneMatch,
+    CartPriceRequest,
+    PricedCart,
 )
 
 from app.core.security import get_current_user
-from app.core.database_async import get_session
-from app.core.dependencies import get_option_service, get_option_group_service, get_item_service
+from app.core.database_async import get_session, get_read_session
+from app.core.config import settings
+from app.core.utils import make_etag, etag_matches, not_modified, json_bytes_response, next_cursor, set_next_cursor, page_rows
+from app.core.dependencies import (
+    get_menu_service,
+    get_location_service,
+    get_option_service,
+    get_option_group_service,
+    get_item_service,
+    get_category_service,
+    get_cart_service,
+)
 
 
 oo_router = APIRouter()
@@ -30,22 +66,32 @@ oo_router = APIRouter()
 
 @oo_router.get("/list-option/{option_group_id}", tags=["Option"])
 async def list_option(
+    response: Response,
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
     service: Annotated[OptionServices, Depends(get_option_service)],
     option_group_id: int,
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 10,
+    cursor: str | None = None,
 ) -> list[OptionRead]:
-    return await service.list_option(
-        session=session, current_user=current_user, option_group_id=option_group_id, offset=offset, limit=limit
+    options = await service.list_option(
+        session=session,
+        current_user=current_user,
+        option_group_id=option_group_id,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
     )
+    set_next_cursor(response, options, limit)
+
+    return options
 
 
 @oo_router.get("/get-option/{option_id}", tags=["Option"])
 async def get_option(
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
     service: Annotated[OptionServices, Depends(get_option_service)],
     option_id: int,
 ) -> OptionRead:
@@ -88,26 +134,54 @@ async def patch_option(
     )
 
 
+@oo_router.post("/bulk-create-option/{option_group_id}", tags=["Option"])
+async def bulk_create_option(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[OptionServices, Depends(get_option_service)],
+    option_group_id: int,
+    options_data: list[OptionCreate],
+) -> list[OptionRead]:
+    return await service.bulk_create_option(
+        session=session, current_user=current_user, option_group_id=option_group_id, options_data=options_data
+    )
+
+
+@oo_router.patch("/bulk-patch-option", tags=["Option"])
+async def bulk_patch_option(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[OptionServices, Depends(get_option_service)],
+    options_data: list[OptionBulkPatch],
+) -> list[OptionRead]:
+    return await service.bulk_patch_option(session=session, current_user=current_user, options_data=options_data)
+
+
 ########################################################################################################################
 @oo_router.get("/list-option-group/{item_id}", tags=["Option Group"])
 async def list_option_group(
+    response: Response,
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)],
-    service: Annotated[OptionGroupService, Depends(get_option_group_service)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    service: Annotated[OptionGroupServices, Depends(get_option_group_service)],
     item_id: int,
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 10,
+    cursor: str | None = None,
 ) -> list[OptionGroupRead]:
-    return await service.list_option(
-        session=session, current_user=current_user, item_id=item_id, offset=offset, limit=limit
+    option_groups = await service.list_option_group(
+        session=session, current_user=current_user, item_id=item_id, offset=offset, limit=limit, cursor=cursor
     )
+    set_next_cursor(response, option_groups, limit)
+
+    return option_groups
 
 
 @oo_router.get("/get-option-group/{option_group_id}", tags=["Option Group"])
 async def get_option_group(
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)],
-    service: Annotated[OptionGroupService, Depends(get_option_group_service)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    service: Annotated[OptionGroupServices, Depends(get_option_group_service)],
     option_group_id: int,
 ) -> OptionGroupRead:
     return await service.get_option_group(session=session, current_user=current_user, option_group_id=option_group_id)
@@ -117,7 +191,7 @@ async def get_option_group(
 async def create_option_group(
     current_user: Annotated[UserRead, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_session)],
-    service: Annotated[OptionGroupService, Depends(get_option_group_service)],
+    service: Annotated[OptionGroupServices, Depends(get_option_group_service)],
     item_id: int,
     option_group_data: OptionGroupCreate,
 ) -> OptionGroupRead:
@@ -130,7 +204,7 @@ async def create_option_group(
 async def patch_option_group(
     current_user: Annotated[UserRead, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_session)],
-    service: Annotated[OptionGroupService, Depends(get_option_group_service)],
+    service: Annotated[OptionGroupServices, Depends(get_option_group_service)],
     option_group_id: int,
     option_group_data: OptionGroupPatch,
 ) -> OptionGroupRead:
@@ -143,7 +217,7 @@ async def patch_option_group(
 async def delete_option_group(
     current_user: Annotated[UserRead, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_session)],
-    service: Annotated[OptionGroupService, Depends(get_option_group_service)],
+    service: Annotated[OptionGroupServices, Depends(get_option_group_service)],
     option_group_id: int,
 ) -> dict:
     return await service.delete_option_group(
@@ -151,29 +225,75 @@ async def delete_option_group(
     )
 
 
+@oo_router.post("/bulk-create-option-group/{item_id}", tags=["Option Group"])
+async def bulk_create_option_group(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[OptionGroupServices, Depends(get_option_group_service)],
+    item_id: int,
+    option_groups_data: list[OptionGroupNestedCreate],
+) -> list[OptionGroupRead]:
+    return await service.bulk_create_option_group(
+        session=session, current_user=current_user, item_id=item_id, option_groups_data=option_groups_data
+    )
+
+
+@oo_router.patch("/bulk-patch-option-group", tags=["Option Group"])
+async def bulk_patch_option_group(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[OptionGroupServices, Depends(get_option_group_service)],
+    option_groups_data: list[OptionGroupBulkPatch],
+) -> list[OptionGroupRead]:
+    return await service.bulk_patch_option_group(
+        session=session, current_user=current_user, option_groups_data=option_groups_data
+    )
+
+
 ########################################################################################################################
 @oo_router.get("/list-item/{category}", tags=["Item"])
 async def list_item(
+    request: Request,
+    response: Response,
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)],
     service: Annotated[ItemServices, Depends(get_item_service)],
     category: int,
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 10,
+    cursor: str | None = None,
 ) -> list[ItemRead]:
-    return await service.list_item(
-        session=session, current_user=current_user, category_id=category, offset=offset, limit=limit
-    )
+    snapshot, category_entry = await service.list_item(current_user=current_user, category_id=category)
+    items = page_rows(category_entry["items"], offset, limit, cursor)
+
+    etag = make_etag("list-item", category, offset, limit, cursor, snapshot.menu_id, snapshot.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if settings.PRESERIALIZED_RESPONSES:
+        return json_bytes_response(snapshot.join(items), etag, next_cursor(items, limit))
+    response.headers["ETag"] = etag
+    set_next_cursor(response, items, limit)
+
+    return [snapshot.item_index[item["id"]] for item in items]
 
 
 @oo_router.get("/get-item/{item_id}", tags=["Item"])
 async def get_item(
+    request: Request,
+    response: Response,
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)],
     service: Annotated[ItemServices, Depends(get_item_service)],
     item_id: int,
 ) -> ItemRead:
-    return await service.get_item(session=session, current_user=current_user, item_id=item_id)
+    snapshot, item = await service.get_item(current_user=current_user, item_id=item_id)
+
+    etag = make_etag("get-item", item_id, snapshot.menu_id, snapshot.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if settings.PRESERIALIZED_RESPONSES:
+        return json_bytes_response(snapshot.slice(item), etag)
+    response.headers["ETag"] = etag
+
+    return snapshot.item_index[item_id]
 
 
 @oo_router.post("/create-item/{category_id}", tags=["Item"])
@@ -210,43 +330,93 @@ async def delete_item(
     return await service.delete_item(session=session, current_user=current_user, item_id=item_id)
 
 
-########################################################################################################################
-@oo_router.get("/list-category/", tags=["Category"])
-async def list_category(
+@oo_router.post("/bulk-create-item/{category_id}", tags=["Item"])
+async def bulk_create_item(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[ItemServices, Depends(get_item_service)],
+    category_id: int,
+    items_data: list[ItemNestedCreate],
+) -> list[ItemRead]:
+    return await service.bulk_create_item(
+        session=session, current_user=current_user, category_id=category_id, items_data=items_data
+    )
+
+
+@oo_router.patch("/bulk-patch-item", tags=["Item"])
+async def bulk_patch_item(
     current_user: Annotated[UserRead, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_session)],
     service: Annotated[ItemServices, Depends(get_item_service)],
+    items_data: list[ItemBulkPatch],
+) -> list[ItemRead]:
+    return await service.bulk_patch_item(session=session, current_user=current_user, items_data=items_data)
+
+
+########################################################################################################################
+@oo_router.get("/list-category/{menu_id}", tags=["Category"])
+async def list_category(
+    request: Request,
+    response: Response,
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    service: Annotated[CategoryServices, Depends(get_category_service)],
+    menu_id: int,
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 10,
+    cursor: str | None = None,
 ) -> list[CategoryRead]:
-    return await service.list_category(session=session, current_user=current_user, offset=offset, limit=limit)
+    snapshot, category_entries = await service.list_category(current_user=current_user, menu_id=menu_id)
+    categories = page_rows(category_entries, offset, limit, cursor)
+
+    etag = make_etag("list-category", menu_id, offset, limit, cursor, snapshot.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if settings.PRESERIALIZED_RESPONSES:
+        return json_bytes_response(snapshot.join(categories), etag, next_cursor(categories, limit))
+    response.headers["ETag"] = etag
+    set_next_cursor(response, categories, limit)
+
+    return [snapshot.category_index[category["id"]] for category in categories]
 
 
 @oo_router.get("/get-category/{category_id}", tags=["Category"])
 async def get_category(
+    request: Request,
+    response: Response,
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)],
-    service: Annotated[ItemServices, Depends(get_item_service)],
+    service: Annotated[CategoryServices, Depends(get_category_service)],
     category_id: int,
 ) -> CategoryRead:
-    return await service.get_category(session=session, current_user=current_user, category_id=category_id)
+    snapshot, category = await service.get_category(current_user=current_user, category_id=category_id)
+
+    etag = make_etag("get-category", category_id, snapshot.menu_id, snapshot.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if settings.PRESERIALIZED_RESPONSES:
+        return json_bytes_response(snapshot.slice(category), etag)
+    response.headers["ETag"] = etag
+
+    return snapshot.category_index[category_id]
 
 
-@oo_router.post("/create-category/", tags=["Category"])
+@oo_router.post("/create-category/{menu_id}", tags=["Category"])
 async def create_category(
     current_user: Annotated[UserRead, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_session)],
-    service: Annotated[ItemServices, Depends(get_item_service)],
+    service: Annotated[CategoryServices, Depends(get_category_service)],
+    menu_id: int,
     category_data: CategoryCreate,
 ) -> CategoryRead:
-    return await service.create_category(session=session, current_user=current_user, category_data=category_data)
+    return await service.create_category(
+        session=session, current_user=current_user, menu_id=menu_id, category_data=category_data
+    )
 
 
 @oo_router.patch("/patch-category/{category_id}", tags=["Category"])
 async def patch_category(
     current_user: Annotated[UserRead, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_session)],
-    service: Annotated[ItemServices, Depends(get_item_service)],
+    service: Annotated[CategoryServices, Depends(get_category_service)],
     category_id: int,
     category_data: CategoryPatch,
 ) -> CategoryRead:
@@ -259,7 +429,169 @@ async def patch_category(
 async def delete_category(
     current_user: Annotated[UserRead, Depends(get_current_user)],
     session: Annotated[AsyncSession, Depends(get_session)],
-    service: Annotated[ItemServices, Depends(get_item_service)],
+    service: Annotated[CategoryServices, Depends(get_category_service)],
     category_id: int,
 ) -> dict:
     return await service.delete_category(session=session, current_user=current_user, category_id=category_id)
+
+
+########################################################################################################################
+@oo_router.get("/export-menu/{menu_id}", tags=["Menu"])
+async def export_menu(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    service: Annotated[MenuServices, Depends(get_menu_service)],
+    menu_id: int,
+) -> StreamingResponse:
+    records = await service.export_menu(session=session, current_user=current_user, menu_id=menu_id)
+    return StreamingResponse(records, media_type="application/x-ndjson")
+
+
+@oo_router.post("/import-menu", tags=["Menu"])
+async def import_menu(
+    request: Request,
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[MenuServices, Depends(get_menu_service)],
+) -> MenuImportResult:
+    return await service.import_menu(session=session, current_user=current_user, chunks=request.stream())
+
+
+########################################################################################################################
+@oo_router.get("/nearest-locations", tags=["Location"])
+async def nearest_locations(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    latitude: Annotated[float, Query(ge=-90, le=90)],
+    longitude: Annotated[float, Query(ge=-180, le=180)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+    radius_km: Annotated[float | None, Query(gt=0)] = None,
+) -> list[LocationNearby]:
+    return await service.nearest_locations(latitude=latitude, longitude=longitude, limit=limit, radius_km=radius_km)
+
+
+@oo_router.get("/open-locations", tags=["Location"])
+async def open_locations(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    at: datetime | None = None,
+) -> list[LocationRead]:
+    return await service.open_locations(at=at)
+
+
+@oo_router.get("/is-location-open/{location_id}", tags=["Location"])
+async def is_location_open(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    location_id: int,
+    at: datetime | None = None,
+) -> LocationOpenStatus:
+    return await service.location_open_status(location_id=location_id, at=at)
+
+
+@oo_router.get("/get-location/{location_id}", tags=["Location"])
+async def get_location(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    location_id: int,
+) -> LocationRead:
+    return await service.get_location(session=session, current_user=current_user, location_id=location_id)
+
+
+@oo_router.post("/create-location", tags=["Location"])
+async def create_location(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    location_data: LocationCreate,
+) -> LocationRead:
+    return await service.create_location(session=session, current_user=current_user, location_data=location_data)
+
+
+@oo_router.patch("/patch-location/{location_id}", tags=["Location"])
+async def patch_location(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    location_id: int,
+    location_data: LocationPatch,
+) -> LocationRead:
+    return await service.patch_location(
+        session=session, current_user=current_user, location_id=location_id, location_data=location_data
+    )
+
+
+@oo_router.delete("/delete-location/{location_id}", tags=["Location"])
+async def delete_location(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    location_id: int,
+) -> dict:
+    return await service.delete_location(session=session, current_user=current_user, location_id=location_id)
+
+
+@oo_router.get("/delivering-locations", tags=["Delivery Zone"])
+async def delivering_locations(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    latitude: Annotated[float, Query(ge=-90, le=90)],
+    longitude: Annotated[float, Query(ge=-180, le=180)],
+) -> list[DeliveryZoneMatch]:
+    return await service.delivering_locations(latitude=latitude, longitude=longitude)
+
+
+@oo_router.get("/list-delivery-zone/{location_id}", tags=["Delivery Zone"])
+async def list_delivery_zone(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    location_id: int,
+) -> list[DeliveryZoneRead]:
+    return await service.list_delivery_zone(session=session, current_user=current_user, location_id=location_id)
+
+
+@oo_router.post("/create-delivery-zone/{location_id}", tags=["Delivery Zone"])
+async def create_delivery_zone(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    location_id: int,
+    delivery_zone_data: DeliveryZoneCreate,
+) -> DeliveryZoneRead:
+    return await service.create_delivery_zone(
+        session=session, current_user=current_user, location_id=location_id, delivery_zone_data=delivery_zone_data
+    )
+
+
+@oo_router.delete("/delete-delivery-zone/{delivery_zone_id}", tags=["Delivery Zone"])
+async def delete_delivery_zone(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    session: Annotated[AsyncSession, Depends(get_session)],
+    service: Annotated[LocationServices, Depends(get_location_service)],
+    delivery_zone_id: int,
+) -> dict:
+    return await service.delete_delivery_zone(
+        session=session, current_user=current_user, delivery_zone_id=delivery_zone_id
+    )
+
+
+@oo_router.post("/price-cart/{menu_id}", tags=["Cart"])
+async def price_cart(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    service: Annotated[CartServices, Depends(get_cart_service)],
+    menu_id: int,
+    cart_data: CartPriceRequest,
+) -> PricedCart:
+    return await service.price_cart(menu_id=menu_id, cart_data=cart_data)
+
+
+@oo_router.post("/validate-cart/{menu_id}", tags=["Cart"])
+async def validate_cart(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    service: Annotated[CartServices, Depends(get_cart_service)],
+    menu_id: int,
+    cart_data: CartPriceRequest,
+) -> dict:
+    return await service.validate_cart(menu_id=menu_id, cart_data=cart_data)
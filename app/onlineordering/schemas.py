@@ -1,5 +1,8 @@
-from pydantic import BaseModel
+from typing import Annotated
 
+from pydantic import BaseModel, Field
+
+from app.onlineordering.models import Currency
 
 
 class OptionRead(BaseModel):
@@ -20,6 +23,10 @@ class OptionPatch(BaseModel):
     option_group_fk: int | None = None
 
 
+class OptionBulkPatch(OptionPatch):
+    id: int
+
+
 ########################################################################################################################
 class OptionGroupRead(BaseModel):
     id: int
@@ -33,12 +40,20 @@ class OptionGroupCreate(BaseModel):
     is_required: bool
 
 
+class OptionGroupNestedCreate(OptionGroupCreate):
+    options: list[OptionCreate] = []
+
+
 class OptionGroupPatch(BaseModel):
     allow_multiple: bool | None = None
     is_required: bool | None = None
     item_fk: int | None = None
 
 
+class OptionGroupBulkPatch(OptionGroupPatch):
+    id: int
+
+
 ########################################################################################################################
 class ItemRead(BaseModel):
     id: int
@@ -58,6 +73,10 @@ class ItemCreate(BaseModel):
     is_available: bool = True
 
 
+class ItemNestedCreate(ItemCreate):
+    option_groups: list[OptionGroupNestedCreate] = []
+
+
 class ItemPatch(BaseModel):
     name: str | None = None
     description: str | None = None
@@ -67,6 +86,108 @@ class ItemPatch(BaseModel):
     category_fk: int | None = None
 
 
+class ItemBulkPatch(ItemPatch):
+    id: int
+
+
+########################################################################################################################
+class LocationRead(BaseModel):
+    id: int
+    latitude: float
+    longitude: float
+    name: str
+    address: str
+    working_hours: str | None = None
+    is_active: bool
+    menu_fk: int | None = None
+
+
+class LocationNearby(LocationRead):
+    distance_km: float
+
+
+class LocationOpenStatus(BaseModel):
+    location_id: int
+    is_open: bool
+
+
+class LocationCreate(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    name: str
+    address: str
+    working_hours: str | None = None
+    is_active: bool = True
+    menu_fk: int | None = None
+
+
+class LocationPatch(BaseModel):
+    latitude: float | None = Field(default=None, ge=-90, le=90)
+    longitude: float | None = Field(default=None, ge=-180, le=180)
+    name: str | None = None
+    address: str | None = None
+    working_hours: str | None = None
+    is_active: bool | None = None
+    menu_fk: int | None = None
+
+
+class DeliveryZoneRead(BaseModel):
+    id: int
+    name: str
+    polygon: list[list[float]]
+    location_fk: int
+
+
+class DeliveryZoneCreate(BaseModel):
+    name: str
+    polygon: list[tuple[Annotated[float, Field(ge=-90, le=90)], Annotated[float, Field(ge=-180, le=180)]]] = Field(
+        min_length=3
+    )
+
+
+class DeliveryZoneMatch(BaseModel):
+    zone_id: int
+    location_id: int
+    name: str
+
+
+########################################################################################################################
+class MenuCreate(BaseModel):
+    name: str
+    description: str | None = None
+    price_unit: Currency
+
+
+class MenuImportResult(BaseModel):
+    menu_id: int
+    categories: int
+    items: int
+    option_groups: int
+    options: int
+
+
+########################################################################################################################
+class CartLine(BaseModel):
+    item_id: int
+    quantity: int = Field(default=1, ge=1)
+    option_ids: list[int] = []
+
+
+class CartPriceRequest(BaseModel):
+    lines: list[CartLine] = Field(min_length=1)
+
+
+class PricedCartLine(CartLine):
+    unit_price: float
+    line_total: float
+
+
+class PricedCart(BaseModel):
+    menu_id: int
+    lines: list[PricedCartLine]
+    total: float
+
+
 ########################################################################################################################
 class CategoryRead(BaseModel):
     id: int
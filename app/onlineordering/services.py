@@ -1,24 +1,132 @@
+import json
+
 from fastapi import HTTPException
-from sqlmodel import select, delete
+from sqlmodel import select, delete, insert, update
 from sqlalchemy.orm import selectinload
 
 from app.user.models import Role
-from app.onlineordering.models import Menu, Location, Category, Item, Option, OptionGroup
+from app.onlineordering.models import Menu, Location, DeliveryZone, Category, Item, Option, OptionGroup
+from app.onlineordering.schemas import MenuCreate, CategoryCreate, ItemCreate, OptionGroupCreate, OptionCreate
+from app.onlineordering.snapshot import menu_snapshots
+from app.onlineordering.pricing import price_tables
+from app.onlineordering.spatial import location_index, delivery_zone_index
+from app.onlineordering.hours import opening_hours_index, parse_working_hours
+from app.onlineordering.encoders import encode
+from app.core.config import settings
+from app.core.database_async import AsyncSessionLocal, ReadSessionLocal, get_read_engine
+from app.core.invalidation import invalidation_bus
+from app.core.utils import decode_cursor
+from app.core.querybudget import query_budget
+from app.core.singleflight import single_flight
+
+
+def _paginate(statement, id_column, offset, limit, cursor):
+    after_id = decode_cursor(cursor)
+    if after_id is not None:
+        return statement.where(id_column > after_id).limit(limit)
+    return statement.offset(offset).limit(limit)
+
+
+async def _insert_returning(session, model, rows):
+    # A single multi-row INSERT ... RETURNING (batched by SQLAlchemy's insertmanyvalues), in parameter order.
+    if not rows:
+        return []
+
+    statement = insert(model).returning(*model.__table__.c, sort_by_parameter_order=True)
+    result = await session.exec(statement, params=rows)
+
+    return [dict(row._mapping) for row in result.all()]
+
+
+async def _insert_option_groups(session, groups):
+    # `groups` is a list of (item_id, OptionGroupNestedCreate); option groups and their options take one INSERT each.
+    db_groups = await _insert_returning(
+        session, OptionGroup, [{**group.model_dump(exclude={"options"}), "item_fk": item_id} for item_id, group in groups]
+    )
+    option_rows = [
+        {**option.model_dump(), "option_group_fk": db_group["id"]}
+        for db_group, (_, group) in zip(db_groups, groups)
+        for option in group.options
+    ]
+    db_options = await _insert_returning(session, Option, option_rows)
+
+    options_by_group = {}
+    for db_option in db_options:
+        options_by_group.setdefault(db_option["option_group_fk"], []).append(db_option)
+    for db_group in db_groups:
+        db_group["options"] = options_by_group.get(db_group["id"], [])
+
+    return db_groups
+
+
+async def _update_by_id(session, model, patches):
+    # ORM bulk UPDATE by primary key: one executemany, grouped by SQLAlchemy per set of patched columns.
+    rows = [patch.model_dump(exclude_unset=True) | {"id": patch.id} for patch in patches]
+    rows = [row for row in rows if len(row) > 1]
+
+    if rows:
+        await session.exec(update(model), params=rows)
+
+
+async def _reload(session, model, row_id, *options):
+    # Response models walk the relationships, which cannot lazy-load on an async session once the handler returns.
+    statement = select(model).where(model.id == row_id).options(*options).execution_options(populate_existing=True)
+    result = await session.exec(statement)
+
+    return result.one()
+
+
+async def _require_ids(session, model, ids, name):
+    result = await session.exec(select(model.id).where(model.id.in_(ids)))
+    missing = set(ids) - set(result.all())
+
+    if missing:
+        raise HTTPException(status_code=404, detail=f"{name} not found: {sorted(missing)}.")
+
+
+# Catalog reads resolve to a menu snapshot and the index entry of the requested entity; the router renders the ETag,
+# the pre-serialized bytes or the response model from that one snapshot. Snapshots are built from the primary, so
+# a body never comes from a lagging replica under a revision it does not match.
+async def _category_entry(category_id):
+    menu_id = await menu_snapshots.menu_id_for_category(category_id)
+    snapshot = await menu_snapshots.get(menu_id) if menu_id is not None else None
+    entry = snapshot.category_spans.get(category_id) if snapshot is not None else None
+
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Category not found.")
+
+    return snapshot, entry
+
+
+async def _item_entry(item_id):
+    menu_id = await menu_snapshots.menu_id_for_item(item_id)
+    snapshot = await menu_snapshots.get(menu_id) if menu_id is not None else None
+    entry = snapshot.item_spans.get(item_id) if snapshot is not None else None
+
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Item not found.")
+
+    return snapshot, entry
 
 
 class OptionServices:
     def __init__(self):
         pass
 
-    async def list_option(self, session, current_user, option_group_id, offset, limit):
+    @query_budget(1)
+    @single_flight
+    async def list_option(self, session, current_user, option_group_id, offset, limit, cursor=None):
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
-        statement = select(Option).where(Option.option_group_fk == option_group_id).offset(offset).limit(limit)
+        statement = select(Option).where(Option.option_group_fk == option_group_id).order_by(Option.id)
+        statement = _paginate(statement, Option.id, offset, limit, cursor)
         result = await session.exec(statement)
 
         return result.all()
 
+    @query_budget(1)
+    @single_flight
     async def get_option(self, session, current_user, option_id):
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
@@ -40,6 +148,8 @@ class OptionServices:
         await session.commit()
         await session.refresh(db_data)
 
+        menu_snapshots.bump(await menu_snapshots.menu_id_for_option_group(option_group_id))
+
         return db_data
 
     async def patch_option(self, session, current_user, option_id, option_data):
@@ -50,9 +160,10 @@ class OptionServices:
         result = await session.exec(statement)
         db_option = result.first()
 
-        if not result:
+        if not db_option:
             raise HTTPException(status_code=404, detail="Option not found.")
 
+        old_menu_id = await menu_snapshots.menu_id_for_option(option_id)
         option_data_dump = option_data.model_dump(exclude_unset=True)
 
         for key, value in option_data_dump.items():
@@ -62,12 +173,16 @@ class OptionServices:
         await session.commit()
         await session.refresh(db_option)
 
+        menu_snapshots.bump(old_menu_id, await menu_snapshots.menu_id_for_option(option_id))
+
         return db_option
 
     async def delete_option(self, session, current_user, option_id):
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
+        menu_id = await menu_snapshots.menu_id_for_option(option_id)
+
         statement = delete(Option).where(Option.id == option_id)
         result = await session.exec(statement)
 
@@ -75,15 +190,47 @@ class OptionServices:
             raise HTTPException(status_code=404, detail="Option not found.")
 
         await session.commit()
+        menu_snapshots.bump(menu_id)
 
         return {"message": "Option deleted successfully."}
 
+    async def bulk_create_option(self, session, current_user, option_group_id, options_data):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        rows = [{**option_data.model_dump(), "option_group_fk": option_group_id} for option_data in options_data]
+        db_options = await _insert_returning(session, Option, rows)
+        await session.commit()
+
+        menu_snapshots.bump(await menu_snapshots.menu_id_for_option_group(option_group_id))
+
+        return db_options
+
+    async def bulk_patch_option(self, session, current_user, options_data):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        option_ids = [option_data.id for option_data in options_data]
+        await _require_ids(session, Option, option_ids, "Option")
+        old_menu_ids = await menu_snapshots.menu_ids_for_options(option_ids)
+
+        await _update_by_id(session, Option, options_data)
+        await session.commit()
+
+        menu_snapshots.bump(*old_menu_ids, *await menu_snapshots.menu_ids_for_options(option_ids))
+
+        result = await session.exec(select(Option).where(Option.id.in_(option_ids)).order_by(Option.id))
+
+        return result.all()
+
 
 class OptionGroupServices:
     def __init__(self):
         pass
 
-    async def list_option_group(self, session, current_user, item_id, offset, limit):
+    @query_budget(2)
+    @single_flight
+    async def list_option_group(self, session, current_user, item_id, offset, limit, cursor=None):
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
@@ -91,13 +238,15 @@ class OptionGroupServices:
             select(OptionGroup)
             .where(OptionGroup.item_fk == item_id)
             .options(selectinload(OptionGroup.options))
-            .offset(offset)
-            .limit(limit)
+            .order_by(OptionGroup.id)
         )
+        statement = _paginate(statement, OptionGroup.id, offset, limit, cursor)
         result = await session.exec(statement)
 
         return result.all()
 
+    @query_budget(2)
+    @single_flight
     async def get_option_group(self, session, current_user, option_group_id):
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
@@ -119,7 +268,9 @@ class OptionGroupServices:
         db_data = OptionGroup(**option_group_data_dump)
         session.add(db_data)
         await session.commit()
-        await session.refresh(db_data)
+        db_data = await _reload(session, OptionGroup, db_data.id, selectinload(OptionGroup.options))
+
+        menu_snapshots.bump(await menu_snapshots.menu_id_for_item(item_id))
 
         return db_data
 
@@ -134,6 +285,7 @@ class OptionGroupServices:
         if not db_option_group:
             raise HTTPException(status_code=404, detail="Option Group not found.")
 
+        old_menu_id = await menu_snapshots.menu_id_for_option_group(option_group_id)
         option_group_data_dump = option_group_data.model_dump(exclude_unset=True)
 
         for key, value in option_group_data_dump.items():
@@ -141,7 +293,9 @@ class OptionGroupServices:
 
         session.add(db_option_group)
         await session.commit()
-        await session.refresh(db_option_group)
+        db_option_group = await _reload(session, OptionGroup, option_group_id, selectinload(OptionGroup.options))
+
+        menu_snapshots.bump(old_menu_id, await menu_snapshots.menu_id_for_option_group(option_group_id))
 
         return db_option_group
 
@@ -149,6 +303,8 @@ class OptionGroupServices:
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
+        menu_id = await menu_snapshots.menu_id_for_option_group(option_group_id)
+
         statement = delete(OptionGroup).where(OptionGroup.id == option_group_id)
         result = await session.exec(statement)
 
@@ -156,41 +312,64 @@ class OptionGroupServices:
             raise HTTPException(status_code=404, detail="Option Group not found.")
 
         await session.commit()
+        menu_snapshots.bump(menu_id)
 
         return {"message": "Option Group deleted successfully."}
 
+    async def bulk_create_option_group(self, session, current_user, item_id, option_groups_data):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
 
-class ItemServices:
-    def __init__(self):
-        pass
+        db_option_groups = await _insert_option_groups(session, [(item_id, group) for group in option_groups_data])
+        await session.commit()
+
+        menu_snapshots.bump(await menu_snapshots.menu_id_for_item(item_id))
 
-    async def list_item(self, session, current_user, category_id, offset, limit):
+        return db_option_groups
+
+    async def bulk_patch_option_group(self, session, current_user, option_groups_data):
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
+        option_group_ids = [option_group_data.id for option_group_data in option_groups_data]
+        await _require_ids(session, OptionGroup, option_group_ids, "Option Group")
+        old_menu_ids = await menu_snapshots.menu_ids_for_option_groups(option_group_ids)
+
+        await _update_by_id(session, OptionGroup, option_groups_data)
+        await session.commit()
+
+        menu_snapshots.bump(*old_menu_ids, *await menu_snapshots.menu_ids_for_option_groups(option_group_ids))
+
         statement = (
-            select(Item)
-            .where(Item.category_fk == category_id)
-            .options(selectinload(Item.option_groups).selectinload(OptionGroup.options))
-            .offset(offset)
-            .limit(limit)
+            select(OptionGroup)
+            .where(OptionGroup.id.in_(option_group_ids))
+            .options(selectinload(OptionGroup.options))
+            .order_by(OptionGroup.id)
         )
         result = await session.exec(statement)
 
         return result.all()
 
-    async def get_item(self, session, current_user, item_id):
+
+class ItemServices:
+    def __init__(self):
+        pass
+
+    @query_budget(5)
+    @single_flight
+    async def list_item(self, current_user, category_id):
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
-        statement = (
-            select(Item)
-            .where(Item.id == item_id)
-            .options(selectinload(Item.option_groups).selectinload(OptionGroup.options))
-        )
-        result = await session.exec(statement)
+        return await _category_entry(category_id)
 
-        return result.first()
+    @query_budget(5)
+    @single_flight
+    async def get_item(self, current_user, item_id):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        return await _item_entry(item_id)
 
     async def create_item(self, session, current_user, category_id, item_data):
         if current_user.role == Role.Customer:
@@ -202,7 +381,9 @@ class ItemServices:
         db_data = Item(**item_data_dump)
         session.add(db_data)
         await session.commit()
-        await session.refresh(db_data)
+        db_data = await _reload(session, Item, db_data.id, selectinload(Item.option_groups).selectinload(OptionGroup.options))
+
+        menu_snapshots.bump(await menu_snapshots.menu_id_for_category(category_id))
 
         return db_data
 
@@ -217,6 +398,7 @@ class ItemServices:
         if not db_item:
             raise HTTPException(status_code=404, detail="Item not found.")
 
+        old_menu_id = await menu_snapshots.menu_id_for_item(item_id)
         item_data_dump = item_data.model_dump(exclude_unset=True)
 
         for key, value in item_data_dump.items():
@@ -224,7 +406,11 @@ class ItemServices:
 
         session.add(db_item)
         await session.commit()
-        await session.refresh(db_item)
+        db_item = await _reload(session, Item, item_id, selectinload(Item.option_groups).selectinload(OptionGroup.options))
+
+        # Bump the old menu first so its cached item -> menu mapping is dropped before re-resolving.
+        menu_snapshots.bump(old_menu_id)
+        menu_snapshots.bump(await menu_snapshots.menu_id_for_item(item_id))
 
         return db_item
 
@@ -232,6 +418,8 @@ class ItemServices:
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
+        menu_id = await menu_snapshots.menu_id_for_item(item_id)
+
         statement = delete(Item).where(Item.id == item_id)
         result = await session.exec(statement)
 
@@ -239,41 +427,76 @@ class ItemServices:
             raise HTTPException(status_code=404, detail="Item not found.")
 
         await session.commit()
+        menu_snapshots.bump(menu_id)
 
         return {"message": "Item deleted successfully."}
 
+    async def bulk_create_item(self, session, current_user, category_id, items_data):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
 
-class CategoryServices:
-    def __init__(self):
-        pass
+        rows = [{**item_data.model_dump(exclude={"option_groups"}), "category_fk": category_id} for item_data in items_data]
+        db_items = await _insert_returning(session, Item, rows)
+
+        groups = [(db_item["id"], group) for db_item, item_data in zip(db_items, items_data) for group in item_data.option_groups]
+        db_option_groups = await _insert_option_groups(session, groups)
+        await session.commit()
 
-    async def list_category(self, session, current_user, menu_id, offset, limit):
+        menu_snapshots.bump(await menu_snapshots.menu_id_for_category(category_id))
+
+        groups_by_item = {}
+        for db_option_group in db_option_groups:
+            groups_by_item.setdefault(db_option_group["item_fk"], []).append(db_option_group)
+        for db_item in db_items:
+            db_item["option_groups"] = groups_by_item.get(db_item["id"], [])
+
+        return db_items
+
+    async def bulk_patch_item(self, session, current_user, items_data):
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
+        item_ids = [item_data.id for item_data in items_data]
+        await _require_ids(session, Item, item_ids, "Item")
+        old_menu_ids = await menu_snapshots.menu_ids_for_items(item_ids)
+
+        await _update_by_id(session, Item, items_data)
+        await session.commit()
+
+        menu_snapshots.bump(*old_menu_ids, *await menu_snapshots.menu_ids_for_items(item_ids))
+
         statement = (
-            select(Category)
-            .where(Category.menu_fk == menu_id)
-            .options(selectinload(Category.items).selectinload(Item.option_groups).selectinload(OptionGroup.options))
-            .offset(offset)
-            .limit(limit)
+            select(Item)
+            .where(Item.id.in_(item_ids))
+            .options(selectinload(Item.option_groups).selectinload(OptionGroup.options))
+            .order_by(Item.id)
         )
         result = await session.exec(statement)
 
         return result.all()
 
-    async def get_category(self, session, current_user, category_id):
+
+class CategoryServices:
+    def __init__(self):
+        pass
+
+    @query_budget(4)
+    @single_flight
+    async def list_category(self, current_user, menu_id):
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
-        statement = (
-            select(Category)
-            .where(Category.id == category_id)
-            .options(selectinload(Category.items).selectinload(Item.option_groups).selectinload(OptionGroup.options))
-        )
-        result = await session.exec(statement)
+        snapshot = await menu_snapshots.get(menu_id)
 
-        return result.first()
+        return snapshot, snapshot.index
+
+    @query_budget(5)
+    @single_flight
+    async def get_category(self, current_user, category_id):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        return await _category_entry(category_id)
 
     async def create_category(self, session, current_user, menu_id, category_data):
         if current_user.role == Role.Customer:
@@ -285,7 +508,11 @@ class CategoryServices:
         db_data = Category(**category_data_dump)
         session.add(db_data)
         await session.commit()
-        await session.refresh(db_data)
+        db_data = await _reload(
+            session, Category, db_data.id, selectinload(Category.items).selectinload(Item.option_groups).selectinload(OptionGroup.options)
+        )
+
+        menu_snapshots.bump(menu_id)
 
         return db_data
 
@@ -300,6 +527,7 @@ class CategoryServices:
         if not db_category:
             raise HTTPException(status_code=404, detail="Category not found.")
 
+        old_menu_id = db_category.menu_fk
         category_data_dump = category_data.model_dump(exclude_unset=True)
 
         for key, value in category_data_dump.items():
@@ -307,7 +535,11 @@ class CategoryServices:
 
         session.add(db_category)
         await session.commit()
-        await session.refresh(db_category)
+        db_category = await _reload(
+            session, Category, category_id, selectinload(Category.items).selectinload(Item.option_groups).selectinload(OptionGroup.options)
+        )
+
+        menu_snapshots.bump(old_menu_id, db_category.menu_fk)
 
         return db_category
 
@@ -315,6 +547,8 @@ class CategoryServices:
         if current_user.role == Role.Customer:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
+        menu_id = await menu_snapshots.menu_id_for_category(category_id)
+
         statement = delete(Category).where(Category.id == category_id)
         result = await session.exec(statement)
 
@@ -322,5 +556,380 @@ class CategoryServices:
             raise HTTPException(status_code=404, detail="Category not found.")
 
         await session.commit()
+        menu_snapshots.bump(menu_id)
 
         return {"message": "Category deleted successfully."}
+
+
+# NDJSON record type -> (model, create schema, parent record type, foreign key to the parent), parents first.
+MENU_RECORD_TYPES = {
+    "menu": (Menu, MenuCreate, None, None),
+    "category": (Category, CategoryCreate, "menu", "menu_fk"),
+    "item": (Item, ItemCreate, "category", "category_fk"),
+    "option_group": (OptionGroup, OptionGroupCreate, "item", "item_fk"),
+    "option": (Option, OptionCreate, "option_group", "option_group_fk"),
+}
+
+
+def _menu_export_statements(menu_id):
+    yield "category", select(Category).where(Category.menu_fk == menu_id).order_by(Category.id)
+    yield "item", select(Item).join(Category).where(Category.menu_fk == menu_id).order_by(Item.id)
+    yield (
+        "option_group",
+        select(OptionGroup).join(Item).join(Category).where(Category.menu_fk == menu_id).order_by(OptionGroup.id),
+    )
+    yield (
+        "option",
+        select(Option).join(OptionGroup).join(Item).join(Category).where(Category.menu_fk == menu_id).order_by(Option.id),
+    )
+
+
+def _ndjson_line(record_type, row):
+    return encode({"type": record_type, **row.model_dump()}) + b"\n"
+
+
+class _MenuImporter:
+    def __init__(self, session, batch_size):
+        self.session = session
+        self.batch_size = batch_size
+
+        self.menu_id = None
+        self.id_maps = {record_type: {} for record_type in MENU_RECORD_TYPES}
+        self.pending = {record_type: [] for record_type in MENU_RECORD_TYPES}
+        self.counts = dict.fromkeys(MENU_RECORD_TYPES, 0)
+
+    async def add(self, line_number, line):
+        line = line.strip()
+        if not line:
+            return
+
+        try:
+            record = json.loads(line)
+            record_type = record.pop("type")
+            model, schema, parent_type, parent_fk = MENU_RECORD_TYPES[record_type]
+            data = schema.model_validate(record).model_dump()
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise HTTPException(status_code=422, detail=f"Line {line_number}: invalid menu record.")
+
+        if record_type == "menu":
+            if self.menu_id is not None:
+                raise HTTPException(status_code=422, detail=f"Line {line_number}: only one menu record is allowed.")
+            (db_menu,) = await _insert_returning(self.session, Menu, [data])
+            self.menu_id = db_menu["id"]
+            return
+
+        if self.menu_id is None:
+            raise HTTPException(status_code=422, detail=f"Line {line_number}: the menu record must come first.")
+
+        if parent_type == "menu":
+            parent_id = self.menu_id
+        else:
+            parent_id = await self._parent_id(record_type, parent_type, record.get(parent_fk))
+            if parent_id is None:
+                raise HTTPException(status_code=422, detail=f"Line {line_number}: unknown {parent_type} {record.get(parent_fk)}.")
+
+        self.pending[record_type].append((record.get("id"), {**data, parent_fk: parent_id}))
+        if len(self.pending[record_type]) >= self.batch_size:
+            await self._flush(record_type)
+
+    async def finish(self):
+        for record_type in MENU_RECORD_TYPES:
+            await self._flush(record_type)
+
+        if self.menu_id is None:
+            raise HTTPException(status_code=422, detail="The upload contains no menu record.")
+
+        return {
+            "menu_id": self.menu_id,
+            "categories": self.counts["category"],
+            "items": self.counts["item"],
+            "option_groups": self.counts["option_group"],
+            "options": self.counts["option"],
+        }
+
+    async def _parent_id(self, record_type, parent_type, old_parent_id):
+        if old_parent_id not in self.id_maps[parent_type]:
+            # The parent may still be sitting in an unflushed batch; write every ancestor level first.
+            for ancestor_type in MENU_RECORD_TYPES:
+                if ancestor_type == record_type:
+                    break
+                await self._flush(ancestor_type)
+
+        return self.id_maps[parent_type].get(old_parent_id)
+
+    async def _flush(self, record_type):
+        pending = self.pending[record_type]
+        if not pending:
+            return
+
+        self.pending[record_type] = []
+        model = MENU_RECORD_TYPES[record_type][0]
+        db_rows = await _insert_returning(self.session, model, [data for _, data in pending])
+
+        for (old_id, _), db_row in zip(pending, db_rows):
+            if old_id is not None:
+                self.id_maps[record_type][old_id] = db_row["id"]
+        self.counts[record_type] += len(db_rows)
+
+
+class MenuServices:
+    def __init__(self):
+        pass
+
+    async def export_menu(self, session, current_user, menu_id):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        result = await session.exec(select(Menu).where(Menu.id == menu_id))
+        menu = result.first()
+
+        if not menu:
+            raise HTTPException(status_code=404, detail="Menu not found.")
+
+        return self._stream_menu(menu)
+
+    async def import_menu(self, session, current_user, chunks):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        importer = _MenuImporter(session, settings.MENU_TRANSFER_BATCH_SIZE)
+        line_number = 0
+        buffer = b""
+
+        async for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                line_number += 1
+                await importer.add(line_number, line)
+
+        await importer.add(line_number + 1, buffer)
+        result = await importer.finish()
+        await session.commit()
+
+        menu_snapshots.bump(result["menu_id"])
+
+        return result
+
+    async def _stream_menu(self, menu):
+        yield _ndjson_line("menu", menu)
+
+        # The response outlives the request's session, so the stream owns one. Rows come through server-side
+        # cursors in batches, keeping memory flat; REPEATABLE READ keeps the levels consistent with each other.
+        async with ReadSessionLocal() as session:
+            if get_read_engine().dialect.name == "postgresql":
+                await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+            for record_type, statement in _menu_export_statements(menu.id):
+                rows = await session.stream_scalars(statement.execution_options(yield_per=settings.MENU_TRANSFER_BATCH_SIZE))
+                async for row in rows:
+                    yield _ndjson_line(record_type, row)
+
+
+def _compile_working_hours(working_hours):
+    if working_hours is None:
+        return None
+
+    try:
+        return parse_working_hours(working_hours)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=f"Invalid working hours. {error}")
+
+
+# Invalidations published by other workers: re-read just the touched rows from the primary and apply them the way
+# the writing worker did. A reset (missed notifications) drops the indexes so they reload on next use.
+async def _refresh_locations(invalidation):
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(select(Location).where(Location.id.in_(invalidation.ids)))
+        locations = {location.id: location for location in result.all()}
+
+    for location_id in invalidation.ids:
+        location = locations.get(location_id)
+        if location is None:
+            location_index.remove(location_id)
+            opening_hours_index.remove(location_id)
+            delivery_zone_index.remove_location(location_id)
+        else:
+            location_index.upsert(location)
+            opening_hours_index.upsert(location)
+            delivery_zone_index.set_location_active(location_id, location.is_active)
+
+
+async def _refresh_delivery_zones(invalidation):
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(select(DeliveryZone).where(DeliveryZone.id.in_(invalidation.ids)))
+        zones = {zone.id: zone for zone in result.all()}
+
+    for zone_id in invalidation.ids:
+        if zone_id in zones:
+            delivery_zone_index.upsert(zones[zone_id])
+        else:
+            delivery_zone_index.remove(zone_id)
+
+
+async def _reset_location_indexes():
+    location_index.clear()
+    opening_hours_index.clear()
+    delivery_zone_index.clear()
+
+
+invalidation_bus.subscribe("location", _refresh_locations, reset=_reset_location_indexes)
+invalidation_bus.subscribe("delivery_zone", _refresh_delivery_zones)
+
+
+class LocationServices:
+    def __init__(self):
+        pass
+
+    async def nearest_locations(self, latitude, longitude, limit, radius_km):
+        return await location_index.nearest(latitude, longitude, limit, radius_km)
+
+    async def open_locations(self, at):
+        return await opening_hours_index.open_locations(at)
+
+    async def location_open_status(self, location_id, at):
+        return {"location_id": location_id, "is_open": await opening_hours_index.is_open(location_id, at)}
+
+    @query_budget(1)
+    @single_flight
+    async def get_location(self, session, current_user, location_id):
+        statement = select(Location).where(Location.id == location_id)
+        result = await session.exec(statement)
+        location = result.first()
+
+        if not location:
+            raise HTTPException(status_code=404, detail="Location not found.")
+
+        return location
+
+    async def create_location(self, session, current_user, location_data):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        location_data_dump = location_data.model_dump()
+        location_data_dump["user_fk"] = current_user.id
+        location_data_dump["opening_intervals"] = _compile_working_hours(location_data_dump["working_hours"])
+
+        db_data = Location(**location_data_dump)
+        session.add(db_data)
+        await session.commit()
+        await session.refresh(db_data)
+
+        location_index.upsert(db_data)
+        opening_hours_index.upsert(db_data)
+        invalidation_bus.publish("location", db_data.id)
+
+        return db_data
+
+    async def patch_location(self, session, current_user, location_id, location_data):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        statement = select(Location).where(Location.id == location_id)
+        result = await session.exec(statement)
+        db_location = result.first()
+
+        if not db_location:
+            raise HTTPException(status_code=404, detail="Location not found.")
+
+        location_data_dump = location_data.model_dump(exclude_unset=True)
+        if "working_hours" in location_data_dump:
+            location_data_dump["opening_intervals"] = _compile_working_hours(location_data_dump["working_hours"])
+
+        for key, value in location_data_dump.items():
+            setattr(db_location, key, value)
+
+        session.add(db_location)
+        await session.commit()
+        await session.refresh(db_location)
+
+        location_index.upsert(db_location)
+        opening_hours_index.upsert(db_location)
+        delivery_zone_index.set_location_active(location_id, db_location.is_active)
+        invalidation_bus.publish("location", location_id)
+
+        return db_location
+
+    async def delete_location(self, session, current_user, location_id):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        result = await session.exec(select(Location.id).where(Location.id == location_id))
+
+        if result.first() is None:
+            raise HTTPException(status_code=404, detail="Location not found.")
+
+        await session.exec(delete(DeliveryZone).where(DeliveryZone.location_fk == location_id))
+        await session.exec(delete(Location).where(Location.id == location_id))
+        await session.commit()
+        location_index.remove(location_id)
+        opening_hours_index.remove(location_id)
+        delivery_zone_index.remove_location(location_id)
+        invalidation_bus.publish("location", location_id)
+
+        return {"message": "Location deleted successfully."}
+
+    async def delivering_locations(self, latitude, longitude):
+        return await delivery_zone_index.lookup(latitude, longitude)
+
+    @query_budget(1)
+    async def list_delivery_zone(self, session, current_user, location_id):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        statement = select(DeliveryZone).where(DeliveryZone.location_fk == location_id).order_by(DeliveryZone.id)
+        result = await session.exec(statement)
+
+        return result.all()
+
+    async def create_delivery_zone(self, session, current_user, location_id, delivery_zone_data):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        delivery_zone_data_dump = delivery_zone_data.model_dump()
+        delivery_zone_data_dump["polygon"] = [list(vertex) for vertex in delivery_zone_data_dump["polygon"]]
+        delivery_zone_data_dump["location_fk"] = location_id
+
+        db_data = DeliveryZone(**delivery_zone_data_dump)
+        session.add(db_data)
+        await session.commit()
+        await session.refresh(db_data)
+
+        delivery_zone_index.upsert(db_data)
+        invalidation_bus.publish("delivery_zone", db_data.id)
+
+        return db_data
+
+    async def delete_delivery_zone(self, session, current_user, delivery_zone_id):
+        if current_user.role == Role.Customer:
+            raise HTTPException(status_code=403, detail="Not enough permission.")
+
+        statement = delete(DeliveryZone).where(DeliveryZone.id == delivery_zone_id)
+        result = await session.exec(statement)
+
+        if result.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Delivery Zone not found.")
+
+        await session.commit()
+        delivery_zone_index.remove(delivery_zone_id)
+        invalidation_bus.publish("delivery_zone", delivery_zone_id)
+
+        return {"message": "Delivery Zone deleted successfully."}
+
+
+class CartServices:
+    def __init__(self):
+        pass
+
+    async def price_cart(self, menu_id, cart_data):
+        table = await price_tables.get(menu_id)
+
+        return table.price(cart_data.lines)
+
+    async def validate_cart(self, menu_id, cart_data):
+        table = await price_tables.get(menu_id)
+        for line in cart_data.lines:
+            table.item_index(line.item_id)
+            table.validate_line(line)
+
+        return {"message": "Cart is valid."}
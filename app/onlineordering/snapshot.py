@@ -0,0 +1,253 @@
+from collections import defaultdict
+from functools import cached_property
+
+from fastapi import HTTPException
+from pydantic_core import from_json
+from sqlmodel import select
+from sqlalchemy.orm import selectinload
+
+from app.onlineordering.models import Menu, Category, Item, Option, OptionGroup
+from app.core.database_async import AsyncSessionLocal
+from app.core.sharedcache import shared_catalog
+from app.core.invalidation import invalidation_bus
+from app.core.singleflight import flights, single_flight
+from app.onlineordering.encoders import category_row, encode_menu
+
+
+class MenuSnapshot:
+    # A menu's encoded category tree plus the byte span of every category and item in it. JSON reads slice entities
+    # and pages straight out of `payload` (a shared mapping when SHARED_CACHE_DIR is set); the decoded tree is only
+    # materialised for callers that need dicts.
+    def __init__(self, menu_id, version, payload, index):
+        self.menu_id = menu_id
+        self.version = version
+        self.payload = payload
+        self.index = index
+        self.category_spans = {category["id"]: category for category in index}
+        self.item_spans = {item["id"]: item for category in index for item in category["items"]}
+
+    @cached_property
+    def categories(self):
+        return from_json(bytes(self.payload))
+
+    @cached_property
+    def category_index(self):
+        return {category["id"]: category for category in self.categories}
+
+    @cached_property
+    def item_index(self):
+        return {item["id"]: item for category in self.categories for item in category["items"]}
+
+    def slice(self, entry):
+        start, end = entry["span"]
+        return bytes(self.payload[start:end])
+
+    def join(self, entries):
+        return b"[" + b",".join(self.slice(entry) for entry in entries) + b"]"
+
+
+class MenuSnapshotStore:
+    # Snapshots and entity -> menu lookups always read from the primary: a tree built from a lagging replica
+    # would be cached under the new version and served until the next edit.
+    # With a SharedCache, versions live in the host-wide table and encoded snapshots in shared files: an edit made by
+    # one worker retires every worker's copy, and a snapshot is loaded from the database once per host, not per worker.
+    # Entity -> menu lookups remember the menu version they were learned at and are re-read once it moves; each menu
+    # keeps the ids it answered for, so retiring it only touches its own entries.
+    def __init__(self, session_factory, shared=None):
+        self.session_factory = session_factory
+        self.shared = shared
+        self._versions: dict[int, int] = {}
+        self._snapshots: dict[int, MenuSnapshot] = {}
+        self._category_menu: dict[int, tuple[int, int]] = {}
+        self._item_menu: dict[int, tuple[int, int]] = {}
+        self._menu_categories: defaultdict[int, set[int]] = defaultdict(set)
+        self._menu_items: defaultdict[int, set[int]] = defaultdict(set)
+
+    def version(self, menu_id):
+        if self.shared is not None:
+            return self.shared.version(menu_id)
+        return self._versions.get(menu_id, 0)
+
+    def bump(self, *menu_ids):
+        menu_ids = {menu_id for menu_id in menu_ids if menu_id is not None}
+        self._retire(menu_ids)
+        # Menu ids, not entity ids: a snapshot, its ETags and its entity -> menu lookups are all per menu, so there is
+        # nothing finer for a peer to retire.
+        invalidation_bus.publish("menu", *menu_ids)
+
+    async def on_invalidation(self, invalidation):
+        # With a shared cache the host-wide versions must move once per host: not at all on the publisher's host (it
+        # already did), and elsewhere only in the first worker to claim the message.
+        if self.shared is not None:
+            if invalidation.node == invalidation_bus.node or not self.shared.claim(int(invalidation.id[:16], 16)):
+                return
+        self._retire(invalidation.ids)
+
+    async def on_reset(self):
+        menu_ids = set(self._versions) | set(self._snapshots)
+        if self.shared is not None:
+            menu_ids |= {int(name.removeprefix("menu-")) for name in self.shared.names() if name.startswith("menu-")}
+        self._retire(menu_ids)
+
+    def _retire(self, menu_ids):
+        for menu_id in menu_ids:
+            if self.shared is not None:
+                self.shared.bump(menu_id)
+            else:
+                self._versions[menu_id] = self.version(menu_id) + 1
+            self._snapshots.pop(menu_id, None)
+            self._forget(menu_id)
+
+    def clear(self):
+        self._snapshots.clear()
+        self._category_menu.clear()
+        self._item_menu.clear()
+        self._menu_categories.clear()
+        self._menu_items.clear()
+
+    async def get(self, menu_id):
+        snapshot = self._snapshots.get(menu_id)
+        if snapshot is not None and snapshot.version == self.version(menu_id):
+            return snapshot
+
+        # Concurrent misses share one build and nothing is kept per menu until it succeeds, so unknown ids cost nothing.
+        key = ("MenuSnapshotStore.get", id(self), menu_id)
+        snapshot = await flights.do(key, lambda: self._load(menu_id))
+        if snapshot.version != self.version(menu_id):
+            # We joined a build that started before the latest edit (possibly our own); the next one starts after it.
+            snapshot = await flights.do(key, lambda: self._load(menu_id))
+
+        return snapshot
+
+    async def _load(self, menu_id):
+        version = self.version(menu_id)
+        snapshot = await self._build(menu_id, version)
+        # An edit that landed while we were loading leaves the snapshot stale; keep it out of the store.
+        if version == self.version(menu_id):
+            self._snapshots[menu_id] = snapshot
+            self._remember(snapshot)
+
+        return snapshot
+
+    @single_flight
+    async def menu_id_for_category(self, category_id):
+        statement = select(Category.menu_fk).where(Category.id == category_id)
+        return await self._menu_id(self._category_menu, self._menu_categories, category_id, statement)
+
+    @single_flight
+    async def menu_id_for_item(self, item_id):
+        statement = select(Category.menu_fk).join(Item, Item.category_fk == Category.id).where(Item.id == item_id)
+        return await self._menu_id(self._item_menu, self._menu_items, item_id, statement)
+
+    async def menu_id_for_option_group(self, option_group_id):
+        statement = (
+            select(Category.menu_fk)
+            .join(Item, Item.category_fk == Category.id)
+            .join(OptionGroup, OptionGroup.item_fk == Item.id)
+            .where(OptionGroup.id == option_group_id)
+        )
+        return await self._first(statement)
+
+    async def menu_id_for_option(self, option_id):
+        statement = (
+            select(Category.menu_fk)
+            .join(Item, Item.category_fk == Category.id)
+            .join(OptionGroup, OptionGroup.item_fk == Item.id)
+            .join(Option, Option.option_group_fk == OptionGroup.id)
+            .where(Option.id == option_id)
+        )
+        return await self._first(statement)
+
+    async def menu_ids_for_items(self, item_ids):
+        statement = select(Category.menu_fk).join(Item, Item.category_fk == Category.id).where(Item.id.in_(item_ids))
+        return set(await self._all(statement.distinct()))
+
+    async def menu_ids_for_option_groups(self, option_group_ids):
+        statement = (
+            select(Category.menu_fk)
+            .join(Item, Item.category_fk == Category.id)
+            .join(OptionGroup, OptionGroup.item_fk == Item.id)
+            .where(OptionGroup.id.in_(option_group_ids))
+        )
+        return set(await self._all(statement.distinct()))
+
+    async def menu_ids_for_options(self, option_ids):
+        statement = (
+            select(Category.menu_fk)
+            .join(Item, Item.category_fk == Category.id)
+            .join(OptionGroup, OptionGroup.item_fk == Item.id)
+            .join(Option, Option.option_group_fk == OptionGroup.id)
+            .where(Option.id.in_(option_ids))
+        )
+        return set(await self._all(statement.distinct()))
+
+    async def _all(self, statement):
+        async with self.session_factory() as session:
+            result = await session.exec(statement)
+            return result.all()
+
+    async def _first(self, statement):
+        async with self.session_factory() as session:
+            result = await session.exec(statement)
+            return result.first()
+
+    async def _menu_id(self, lookups, owned, key, statement):
+        cached = lookups.get(key)
+        if cached is not None and cached[1] == self.version(cached[0]):
+            return cached[0]
+
+        menu_id = await self._first(statement)
+        if menu_id is not None:
+            lookups[key] = (menu_id, self.version(menu_id))
+            owned[menu_id].add(key)
+
+        return menu_id
+
+    async def _build(self, menu_id, version):
+        name = f"menu-{menu_id}"
+        if self.shared is not None:
+            blob = self.shared.get(name, version)
+            if blob is not None:
+                return MenuSnapshot(menu_id, version, blob.payload, blob.index)
+
+        statement = (
+            select(Category)
+            .where(Category.menu_fk == menu_id)
+            .options(selectinload(Category.items).selectinload(Item.option_groups).selectinload(OptionGroup.options))
+            .order_by(Category.id)
+        )
+        async with self.session_factory() as session:
+            result = await session.exec(statement)
+            categories = [category_row(category) for category in result.all()]
+            # Only an empty menu costs the extra query; a missing one must not be cached as empty.
+            if not categories and (await session.exec(select(Menu.id).where(Menu.id == menu_id))).first() is None:
+                raise HTTPException(status_code=404, detail="Menu not found.")
+        payload, index = encode_menu(categories)
+
+        if self.shared is not None and version == self.version(menu_id):
+            # Serve from the mapping too, so this worker keeps no private copy of the payload.
+            blob = self.shared.put(name, version, index, payload)
+            payload, index = blob.payload, blob.index
+
+        return MenuSnapshot(menu_id, version, payload, index)
+
+    def _remember(self, snapshot):
+        categories = self._menu_categories[snapshot.menu_id]
+        items = self._menu_items[snapshot.menu_id]
+        for category in snapshot.index:
+            self._category_menu[category["id"]] = (snapshot.menu_id, snapshot.version)
+            categories.add(category["id"])
+            for item in category["items"]:
+                self._item_menu[item["id"]] = (snapshot.menu_id, snapshot.version)
+                items.add(item["id"])
+
+    def _forget(self, menu_id):
+        # An id that moved to another menu since is owned there now and stays.
+        for lookups, owned in ((self._category_menu, self._menu_categories), (self._item_menu, self._menu_items)):
+            for key in owned.pop(menu_id, ()):
+                if lookups.get(key, (None,))[0] == menu_id:
+                    del lookups[key]
+
+
+menu_snapshots = MenuSnapshotStore(AsyncSessionLocal, shared_catalog)
+invalidation_bus.subscribe("menu", menu_snapshots.on_invalidation, reset=menu_snapshots.on_reset)
@@ -0,0 +1,319 @@
+import asyncio
+import heapq
+import math
+
+from sqlmodel import select
+
+from app.onlineordering.models import Location, DeliveryZone
+from app.core.config import settings
+from app.core.database_async import AsyncSessionLocal
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def location_row(location):
+    return {
+        "id": location.id,
+        "latitude": location.latitude,
+        "longitude": location.longitude,
+        "name": location.name,
+        "address": location.address,
+        "working_hours": location.working_hours,
+        "is_active": location.is_active,
+        "menu_fk": location.menu_fk,
+    }
+
+
+def _chebyshev(cell, origin):
+    return max(abs(cell[0] - origin[0]), abs(cell[1] - origin[1]))
+
+
+class LocationGridIndex:
+    # Active locations bucketed into a fixed lat/lon grid. Nearest-N walks rings of cells outwards from the query
+    # point and stops once no unvisited cell can hold anything closer than the current N-th result.
+    def __init__(self, session_factory, cell_degrees):
+        self.session_factory = session_factory
+        self.cell_degrees = cell_degrees
+
+        self._cells: dict[tuple[int, int], dict[int, dict]] = {}
+        self._cell_of: dict[int, tuple[int, int]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    def upsert(self, location):
+        if not self._loaded:
+            return
+
+        self.remove(location.id)
+        if not location.is_active:
+            return
+
+        cell = self._cell(location.latitude, location.longitude)
+        self._cells.setdefault(cell, {})[location.id] = location_row(location)
+        self._cell_of[location.id] = cell
+
+    def remove(self, location_id):
+        cell = self._cell_of.pop(location_id, None)
+        if cell is None:
+            return
+
+        bucket = self._cells[cell]
+        bucket.pop(location_id, None)
+        if not bucket:
+            del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._cell_of.clear()
+        self._loaded = False
+
+    async def nearest(self, latitude, longitude, limit, radius_km=None):
+        await self._ensure_loaded()
+
+        if radius_km is not None:
+            return self._within(latitude, longitude, radius_km)[:limit]
+
+        origin = self._cell(latitude, longitude)
+        best = []  # max-heap of (-distance, id, row) holding the current `limit` nearest
+        seen = 0
+        ring = 0
+
+        while seen < len(self._cell_of):
+            # Once a ring has more cells than the grid has occupied ones, scanning the rest directly is cheaper.
+            if 8 * ring > len(self._cells):
+                cells = [cell for cell in self._cells if _chebyshev(cell, origin) >= ring]
+            else:
+                cells = self._ring(origin, ring)
+
+            for cell in cells:
+                for row in self._cells.get(cell, {}).values():
+                    seen += 1
+                    distance = haversine_km(latitude, longitude, row["latitude"], row["longitude"])
+                    if len(best) < limit:
+                        heapq.heappush(best, (-distance, row["id"], row))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, row["id"], row))
+
+            if len(best) == limit and -best[0][0] <= self._ring_clearance_km(latitude, ring):
+                break
+            ring += 1
+
+        return sorted(({**row, "distance_km": -distance} for distance, _, row in best), key=lambda row: row["distance_km"])
+
+    def _within(self, latitude, longitude, radius_km):
+        lat_cells = math.ceil(radius_km / (KM_PER_DEGREE * self.cell_degrees))
+        lon_km_per_degree = KM_PER_DEGREE * max(math.cos(math.radians(min(abs(latitude) + lat_cells * self.cell_degrees, 89.0))), 1e-6)
+        lon_cells = math.ceil(radius_km / (lon_km_per_degree * self.cell_degrees))
+        origin_lat, origin_lon = self._cell(latitude, longitude)
+
+        if (2 * lat_cells + 1) * (2 * lon_cells + 1) > len(self._cells):
+            cells = [
+                (cell_lat, cell_lon)
+                for cell_lat, cell_lon in self._cells
+                if abs(cell_lat - origin_lat) <= lat_cells and abs(cell_lon - origin_lon) <= lon_cells
+            ]
+        else:
+            cells = [
+                (cell_lat, cell_lon)
+                for cell_lat in range(origin_lat - lat_cells, origin_lat + lat_cells + 1)
+                for cell_lon in range(origin_lon - lon_cells, origin_lon + lon_cells + 1)
+            ]
+
+        matches = []
+        for cell in cells:
+            for row in self._cells.get(cell, {}).values():
+                distance = haversine_km(latitude, longitude, row["latitude"], row["longitude"])
+                if distance <= radius_km:
+                    matches.append({**row, "distance_km": distance})
+
+        return sorted(matches, key=lambda row: row["distance_km"])
+
+    def _ring_clearance_km(self, latitude, ring):
+        # Lower bound on the distance to any point outside rings 0..ring, using the narrowest longitude spacing
+        # those rings can reach.
+        if ring == 0:
+            return 0.0
+        reach = min(abs(latitude) + (ring + 1) * self.cell_degrees, 89.0)
+        return ring * self.cell_degrees * KM_PER_DEGREE * math.cos(math.radians(reach))
+
+    @staticmethod
+    def _ring(origin, ring):
+        origin_lat, origin_lon = origin
+        if ring == 0:
+            yield origin
+            return
+
+        for offset in range(-ring, ring + 1):
+            yield origin_lat - ring, origin_lon + offset
+            yield origin_lat + ring, origin_lon + offset
+        for offset in range(-ring + 1, ring):
+            yield origin_lat + offset, origin_lon - ring
+            yield origin_lat + offset, origin_lon + ring
+
+    def _cell(self, latitude, longitude):
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+
+        async with self._lock:
+            if self._loaded:
+                return
+
+            async with self.session_factory() as session:
+                result = await session.exec(select(Location).where(Location.is_active))
+                locations = result.all()
+
+            self._loaded = True
+            for location in locations:
+                self.upsert(location)
+
+
+class CompiledZone:
+    # Edges are stored as (lat_min, lat_max, lon_at_lat_min_vertex, lat_of_that_vertex, dlon/dlat) so the
+    # even-odd ray cast per edge is two comparisons and one multiply-add.
+    __slots__ = ("id", "location_id", "name", "bbox", "edges")
+
+    def __init__(self, zone):
+        self.id = zone.id
+        self.location_id = zone.location_fk
+        self.name = zone.name
+
+        latitudes = [vertex[0] for vertex in zone.polygon]
+        longitudes = [vertex[1] for vertex in zone.polygon]
+        self.bbox = (min(latitudes), min(longitudes), max(latitudes), max(longitudes))
+
+        self.edges = []
+        vertices = list(zip(latitudes, longitudes))
+        for (lat1, lon1), (lat2, lon2) in zip(vertices, vertices[1:] + vertices[:1]):
+            if lat1 == lat2:
+                continue
+            if lat1 > lat2:
+                lat1, lon1, lat2, lon2 = lat2, lon2, lat1, lon1
+            self.edges.append((lat1, lat2, lon1, lat1, (lon2 - lon1) / (lat2 - lat1)))
+
+    def contains(self, latitude, longitude):
+        lat_min, lon_min, lat_max, lon_max = self.bbox
+        if not (lat_min <= latitude <= lat_max and lon_min <= longitude <= lon_max):
+            return False
+
+        inside = False
+        for edge_lat_min, edge_lat_max, edge_lon, edge_lat, slope in self.edges:
+            if edge_lat_min <= latitude < edge_lat_max and longitude < edge_lon + (latitude - edge_lat) * slope:
+                inside = not inside
+
+        return inside
+
+
+class DeliveryZoneIndex:
+    # Delivery polygons registered in every grid cell their bounding box touches; a lookup only tests the
+    # zones of the query point's cell.
+    def __init__(self, session_factory, cell_degrees):
+        self.session_factory = session_factory
+        self.cell_degrees = cell_degrees
+
+        self._zones: dict[int, CompiledZone] = {}
+        self._cells: dict[tuple[int, int], set[int]] = {}
+        self._inactive_locations: set[int] = set()
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def upsert(self, zone):
+        if not self._loaded:
+            return
+
+        self.remove(zone.id)
+        compiled = CompiledZone(zone)
+        self._zones[zone.id] = compiled
+        for cell in self._bbox_cells(compiled.bbox):
+            self._cells.setdefault(cell, set()).add(zone.id)
+
+    def remove(self, zone_id):
+        compiled = self._zones.pop(zone_id, None)
+        if compiled is None:
+            return
+
+        for cell in self._bbox_cells(compiled.bbox):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(zone_id)
+                if not bucket:
+                    del self._cells[cell]
+
+    def remove_location(self, location_id):
+        for zone_id in [zone.id for zone in self._zones.values() if zone.location_id == location_id]:
+            self.remove(zone_id)
+        self._inactive_locations.discard(location_id)
+
+    def set_location_active(self, location_id, is_active):
+        if is_active:
+            self._inactive_locations.discard(location_id)
+        else:
+            self._inactive_locations.add(location_id)
+
+    def clear(self):
+        self._zones.clear()
+        self._cells.clear()
+        self._inactive_locations.clear()
+        self._loaded = False
+
+    async def lookup(self, latitude, longitude):
+        await self._ensure_loaded()
+
+        matches = []
+        for zone_id in self._cells.get(self._cell(latitude, longitude), ()):
+            zone = self._zones[zone_id]
+            if zone.location_id not in self._inactive_locations and zone.contains(latitude, longitude):
+                matches.append({"zone_id": zone.id, "location_id": zone.location_id, "name": zone.name})
+
+        return sorted(matches, key=lambda match: match["zone_id"])
+
+    def _bbox_cells(self, bbox):
+        lat_min, lon_min, lat_max, lon_max = bbox
+        cell_lat_min, cell_lon_min = self._cell(lat_min, lon_min)
+        cell_lat_max, cell_lon_max = self._cell(lat_max, lon_max)
+
+        for cell_lat in range(cell_lat_min, cell_lat_max + 1):
+            for cell_lon in range(cell_lon_min, cell_lon_max + 1):
+                yield cell_lat, cell_lon
+
+    def _cell(self, latitude, longitude):
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+
+        async with self._lock:
+            if self._loaded:
+                return
+
+            async with self.session_factory() as session:
+                result = await session.exec(select(DeliveryZone))
+                zones = result.all()
+                result = await session.exec(select(Location.id).where(Location.is_active == False))  # noqa: E712
+                inactive_locations = result.all()
+
+            self._loaded = True
+            self._inactive_locations.update(inactive_locations)
+            for zone in zones:
+                self.upsert(zone)
+
+
+location_index = LocationGridIndex(AsyncSessionLocal, settings.LOCATION_GRID_CELL_DEGREES)
+delivery_zone_index = DeliveryZoneIndex(AsyncSessionLocal, settings.DELIVERY_ZONE_GRID_CELL_DEGREES)
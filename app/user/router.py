@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import EmailStr
 
@@ -8,8 +8,9 @@ from app.user.schemas import UserRead, UserCreate, UserCreateByAdmin, UserUpdate
 from app.user.services import UserServices
 
 from app.core.security import get_current_user
-from app.core.database_async import get_session
+from app.core.database_async import get_session, get_read_session
 from app.core.dependencies import get_user_service
+from app.core.utils import set_next_cursor
 
 
 user_router = APIRouter()
@@ -17,19 +18,26 @@ user_router = APIRouter()
 
 @user_router.get("/list", tags=["Users"])
 async def list_users(
+    response: Response,
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
     service: Annotated[UserServices, Depends(get_user_service)],
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 10,
+    cursor: str | None = None,
 ) -> list[UserRead]:
-    return await service.list_users(current_user=current_user, session=session, offset=offset, limit=limit)
+    users = await service.list_users(
+        current_user=current_user, session=session, offset=offset, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, users, limit)
+
+    return users
 
 
 @user_router.get("/get", tags=["Users"])
 async def get_user(
     current_user: Annotated[UserRead, Depends(get_current_user)],
-    session: Annotated[AsyncSession, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_read_session)],
     service: Annotated[UserServices, Depends(get_user_service)],
     user_id: Annotated[int | None, Query()] = None,
     email: Annotated[EmailStr | None, Query()] = None,
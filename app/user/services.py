@@ -2,22 +2,29 @@ from fastapi import HTTPException
 from sqlmodel import select, delete
 
 from app.user.models import Role, OoUserModel as User
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, invalidate_principal
+from app.core.utils import decode_cursor
+from app.core.querybudget import query_budget
 
 
 class UserServices:
     def __init__(self):
         pass
 
-    async def list_users(self, current_user, session, offset, limit):
-        print(current_user.role)
+    @query_budget(1)
+    async def list_users(self, current_user, session, offset, limit, cursor=None):
         if current_user.role != Role.SuperAdmin:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
-        statement = select(User).offset(offset).limit(limit)
+        after_id = decode_cursor(cursor)
+        if after_id is not None:
+            statement = select(User).where(User.id > after_id).order_by(User.id).limit(limit)
+        else:
+            statement = select(User).order_by(User.id).offset(offset).limit(limit)
         result = await session.exec(statement)
         return result.all()
 
+    @query_budget(1)
     async def get_user(self, current_user, session, user_id, username, email):
         if current_user.role != Role.SuperAdmin:
             raise HTTPException(status_code=403, detail="Not enough permission.")
@@ -35,7 +42,7 @@ class UserServices:
 
     async def create_user(self, session, user_data):
         user_json = user_data.model_dump()
-        user_json["hashed_password"] = get_password_hash(user_json.pop("password"))
+        user_json["hashed_password"] = await get_password_hash(user_json.pop("password"))
         user_json["role"] = "Customer"
 
         db_user = User(**user_json)
@@ -50,7 +57,7 @@ class UserServices:
             raise HTTPException(status_code=403, detail="Not enough permission.")
 
         user_json = user_data.model_dump()
-        user_json["hashed_password"] = get_password_hash(user_json.pop("password"))
+        user_json["hashed_password"] = await get_password_hash(user_json.pop("password"))
 
         db_user = User(**user_json)
         session.add(db_user)
@@ -71,7 +78,7 @@ class UserServices:
 
         user_data = user_data.model_dump(exclude_unset=True)
         if "password" in user_data.keys():
-            user_data["hashed_password"] = get_password_hash(user_data.pop("password"))
+            user_data["hashed_password"] = await get_password_hash(user_data.pop("password"))
 
         for key, value in user_data.items():
             setattr(db_user, key, value)
@@ -80,6 +87,8 @@ class UserServices:
         await session.commit()
         await session.refresh(db_user)
 
+        invalidate_principal(user_id)
+
         return db_user
 
     async def delete_user(self, current_user, session, user_id):
@@ -93,5 +102,6 @@ class UserServices:
             raise HTTPException(status_code=404, detail="User not found.")
 
         await session.commit()
+        invalidate_principal(user_id)
 
         return {"message": "User deleted successfully."}
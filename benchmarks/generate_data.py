@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from itertools import batched
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.hashing import pwd_context
+from app.core.migrations import upgrade
+from app.onlineordering.hours import parse_working_hours
+from app.onlineordering.models import Menu, Location, DeliveryZone, Category, Item, OptionGroup, Option
+from app.user.models import OoUserModel, Role
+
+
+PASSWORD = "bench-password"
+
+CITIES = [
+    (43.6532, -79.3832),
+    (45.5019, -73.5674),
+    (49.2827, -123.1207),
+    (40.7128, -74.0060),
+    (51.5072, -0.1276),
+    (48.8566, 2.3522),
+]
+WORKING_HOURS = [
+    "Mon-Fri 07:00-22:00; Sat-Sun 09:00-23:00",
+    "Daily 11:00-23:00",
+    "Mon-Thu 10:00-22:00; Fri-Sat 10:00-02:00; Sun closed",
+    "Daily 00:00-24:00",
+    "Tue-Sun 12:00-15:00, 17:30-22:30",
+]
+CURRENCIES = ["USD", "CAD", "EUR", "GBP"]
+
+
+def plan(scale):
+    return {
+        "menus": max(1, math.ceil(10 * scale)),
+        "categories_per_menu": 20,
+        "items_per_category": 25,
+        "option_groups_per_item": 3,
+        "options_per_group": 4,
+        "locations": max(1, math.ceil(1000 * scale)),
+        "users": max(1, math.ceil(100000 * scale)),
+    }
+
+
+# Rows ------------------------------------------------------------------------------------------------------------------
+# Ids are assigned here, after the current maximum of each table, so children can reference parents without a
+# RETURNING round trip and repeated runs append instead of colliding.
+def user_rows(rng, counts, start, password_hash):
+    for user_id in range(start + 1, start + counts["users"] + 1):
+        role = Role.Owner if user_id % 100 == 0 else Role.Customer
+        yield (user_id, f"Name{user_id}", f"Last{user_id}", f"bench{user_id}", f"+1555{user_id:07d}"[-12:], f"bench{user_id}@example.com", password_hash, None, role.name)
+
+
+def menu_rows(rng, counts, start):
+    for menu_id in range(start + 1, start + counts["menus"] + 1):
+        yield (menu_id, f"Menu {menu_id}", f"Synthetic menu {menu_id}", rng.choice(CURRENCIES))
+
+
+def category_rows(rng, counts, starts):
+    category_id = starts["category"]
+    for menu_id in range(starts["menu"] + 1, starts["menu"] + counts["menus"] + 1):
+        for _ in range(counts["categories_per_menu"]):
+            category_id += 1
+            yield (category_id, f"Category {category_id}", menu_id)
+
+
+def item_rows(rng, counts, starts):
+    item_id = starts["item"]
+    total_categories = counts["menus"] * counts["categories_per_menu"]
+    for category_id in range(starts["category"] + 1, starts["category"] + total_categories + 1):
+        for _ in range(counts["items_per_category"]):
+            item_id += 1
+            yield (item_id, f"Item {item_id}", f"Synthetic item {item_id}", None, round(rng.uniform(3, 40), 2), rng.random() > 0.05, category_id)
+
+
+def option_group_rows(rng, counts, starts):
+    option_group_id = starts["optiongroup"]
+    total_items = counts["menus"] * counts["categories_per_menu"] * counts["items_per_category"]
+    for item_id in range(starts["item"] + 1, starts["item"] + total_items + 1):
+        for position in range(counts["option_groups_per_item"]):
+            option_group_id += 1
+            yield (option_group_id, position > 0, position == 0, item_id)
+
+
+def option_rows(rng, counts, starts):
+    option_id = starts["option"]
+    total_groups = counts["menus"] * counts["categories_per_menu"] * counts["items_per_category"] * counts["option_groups_per_item"]
+    for option_group_id in range(starts["optiongroup"] + 1, starts["optiongroup"] + total_groups + 1):
+        for _ in range(counts["options_per_group"]):
+            option_id += 1
+            yield (option_id, f"Option {option_id}", round(rng.choice([0, 0, 0.5, 1, 1.5, 2, 3]), 2), option_group_id)
+
+
+def location_rows(rng, counts, starts):
+    owner_ids = [user_id for user_id in range(starts["oousermodel"] + 1, starts["oousermodel"] + counts["users"] + 1) if user_id % 100 == 0] or [None]
+    compiled_hours = {hours: json.dumps(parse_working_hours(hours)) for hours in WORKING_HOURS}
+
+    for offset, location_id in enumerate(range(starts["location"] + 1, starts["location"] + counts["locations"] + 1)):
+        latitude, longitude = rng.choice(CITIES)
+        hours = rng.choice(WORKING_HOURS)
+        yield (
+            location_id,
+            round(latitude + rng.gauss(0, 0.15), 6),
+            round(longitude + rng.gauss(0, 0.15), 6),
+            f"Location {location_id}",
+            f"{location_id} Synthetic Street",
+            hours,
+            compiled_hours[hours],
+            rng.random() > 0.1,
+            owner_ids[offset % len(owner_ids)],
+            starts["menu"] + 1 + offset % counts["menus"],
+        )
+
+
+def delivery_zone_rows(rng, counts, starts, locations):
+    zone_id = starts["deliveryzone"]
+    for location in locations:
+        zone_id += 1
+        latitude, longitude, radius = location[1], location[2], rng.uniform(0.02, 0.08)
+        ring = [[round(latitude + radius * math.sin(angle), 6), round(longitude + radius * math.cos(angle), 6)] for angle in (i * math.pi / 4 for i in range(8))]
+        yield (zone_id, f"Zone {zone_id}", json.dumps(ring), location[0])
+
+
+# Writers ---------------------------------------------------------------------------------------------------------------
+class SqliteWriter:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def write(self, table, columns, rows):
+        placeholders = ", ".join("?" for _ in columns)
+        statement = f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({placeholders})'
+        await self.conn.exec_driver_sql(statement, list(rows))
+
+    async def finish(self, tables):
+        pass
+
+
+class PostgresWriter:
+    def __init__(self, conn, driver_connection):
+        self.conn = conn
+        self.driver_connection = driver_connection
+
+    async def write(self, table, columns, rows):
+        await self.driver_connection.copy_records_to_table(table, records=rows, columns=columns)
+
+    async def finish(self, tables):
+        # COPY bypasses the id sequences; move them past the rows we wrote.
+        for table in tables:
+            await self.driver_connection.execute(f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), COALESCE(MAX(id), 1)) FROM \"{table}\"")
+
+
+async def make_writer(conn):
+    if conn.dialect.name == "postgresql":
+        raw_connection = await conn.get_raw_connection()
+        return PostgresWriter(conn, raw_connection.driver_connection)
+    return SqliteWriter(conn)
+
+
+# Main ------------------------------------------------------------------------------------------------------------------
+COLUMNS = {
+    OoUserModel: ["id", "name", "last_name", "username", "phone_number", "email", "hashed_password", "image", "role"],
+    Menu: ["id", "name", "description", "price_unit"],
+    Category: ["id", "name", "menu_fk"],
+    Item: ["id", "name", "description", "image", "price", "is_available", "category_fk"],
+    OptionGroup: ["id", "allow_multiple", "is_required", "item_fk"],
+    Option: ["id", "name", "price", "option_group_fk"],
+    Location: ["id", "latitude", "longitude", "name", "address", "working_hours", "opening_intervals", "is_active", "user_fk", "menu_fk"],
+    DeliveryZone: ["id", "name", "polygon", "location_fk"],
+}
+
+
+async def current_max_ids(conn):
+    starts = {}
+    for model in COLUMNS:
+        result = await conn.execute(select(func.coalesce(func.max(model.id), 0)))
+        starts[model.__tablename__] = result.scalar_one()
+    return starts
+
+
+async def generate(database_url, scale, seed, batch_size):
+    rng = random.Random(seed)
+    counts = plan(scale)
+    engine = create_async_engine(database_url)
+
+    async with engine.connect() as conn:
+        await conn.run_sync(upgrade)
+
+    written = {}
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        writer = await make_writer(conn)
+        starts = await current_max_ids(conn)
+        # One bcrypt hash shared by every synthetic user; hashing per row would dominate the run.
+        password_hash = pwd_context.hash(PASSWORD)
+        locations = list(location_rows(rng, counts, starts))
+
+        sources = [
+            (OoUserModel, user_rows(rng, counts, starts["oousermodel"], password_hash)),
+            (Menu, menu_rows(rng, counts, starts["menu"])),
+            (Category, category_rows(rng, counts, starts)),
+            (Item, item_rows(rng, counts, starts)),
+            (OptionGroup, option_group_rows(rng, counts, starts)),
+            (Option, option_rows(rng, counts, starts)),
+            (Location, iter(locations)),
+            (DeliveryZone, delivery_zone_rows(rng, counts, starts, locations)),
+        ]
+        for model, rows in sources:
+            table = model.__tablename__
+            written[table] = 0
+            for batch in batched(rows, batch_size):
+                await writer.write(table, COLUMNS[model], batch)
+                written[table] += len(batch)
+
+        await writer.finish([model.__tablename__ for model in COLUMNS])
+
+    await engine.dispose()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "seed": seed,
+        "scale": scale,
+        "rows": written,
+        "total_rows": sum(written.values()),
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(sum(written.values()) / elapsed) if elapsed else None,
+        "first_menu_id": starts["menu"] + 1,
+        "first_username": f"bench{starts['oousermodel'] + 1}",
+        "password": PASSWORD,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load a deterministic synthetic dataset (users, menus, locations).")
+    parser.add_argument("--database-url", default=None, help="Defaults to the app's DATABASE_URL.")
+    parser.add_argument("--scale", type=float, default=1.0, help="1.0 is ~180k rows; 5.5 is ~1M.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(generate(args.database_url or settings.DATABASE_URL, args.scale, args.seed, args.batch_size))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
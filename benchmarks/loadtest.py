@@ -0,0 +1,423 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+
+ROOT = Path(__file__).resolve().parent.parent
+P = "/online-ordering"
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin"
+CUSTOMER_PASSWORD = "bench-password"
+
+DEFAULT_MIX = {
+    "login": 2,
+    "list_category": 25,
+    "get_category": 10,
+    "get_item": 25,
+    "nearest_locations": 10,
+    "open_locations": 5,
+    "price_cart": 15,
+    "patch_option": 5,
+    "list_item_admin": 3,
+}
+
+
+# Boot ------------------------------------------------------------------------------------------------------------------
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_env(database_url):
+    env = dict(os.environ)
+    env.setdefault("PROJECT_NAME", "oo-fastapi-bench")
+    env.setdefault("VERSION", "bench")
+    env.setdefault("SECRET_KEY", "bench-secret-key")
+    env.setdefault("ALGORITHM", "HS256")
+    env.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "600")
+    env.setdefault("POSTGRES_URL", "postgresql://localhost/unused")
+    env.setdefault("POSTGRES_URL_ASYNC", "postgresql+asyncpg://localhost/unused")
+    env.setdefault("SQLITE_URL", "sqlite+aiosqlite:///unused.db")
+
+    if database_url.startswith("sqlite"):
+        env["DEBUG"] = "true"
+        env["SQLITE_URL"] = database_url
+    else:
+        env["DEBUG"] = "false"
+        env["POSTGRES_URL_ASYNC"] = database_url
+        # The migration command and the LISTEN connection use the driver-less URL.
+        scheme, _, rest = database_url.partition("://")
+        env["POSTGRES_URL"] = f"{scheme.split('+')[0]}://{rest}"
+
+    return env
+
+
+def start_server(database_url, workers):
+    subprocess.run([sys.executable, "-m", "app.core.migrations", "upgrade"], cwd=ROOT, env=_server_env(database_url), check=True, stdout=subprocess.DEVNULL)
+
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT,
+        env=_server_env(database_url),
+        stdout=subprocess.DEVNULL,
+    )
+
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def boot_server(database_url, workers):
+    # The migration run blocks until it exits; keep it off the event loop.
+    process, base_url = await asyncio.to_thread(start_server, database_url, workers)
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(200):
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}.")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return process, base_url
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+
+    process.terminate()
+    raise RuntimeError("Server did not become healthy.")
+
+
+# Seed ------------------------------------------------------------------------------------------------------------------
+def menu_ndjson(rng, categories, items_per_category, option_groups_per_item, options_per_group):
+    lines = [{"type": "menu", "name": "Bench menu", "description": None, "price_unit": "USD"}]
+    item_id = option_group_id = option_id = 0
+
+    for category_id in range(1, categories + 1):
+        lines.append({"type": "category", "id": category_id, "name": f"Category {category_id}"})
+        for _ in range(items_per_category):
+            item_id += 1
+            lines.append({"type": "item", "id": item_id, "category_fk": category_id, "name": f"Item {item_id}", "price": round(rng.uniform(3, 30), 2)})
+            for group in range(option_groups_per_item):
+                option_group_id += 1
+                lines.append({"type": "option_group", "id": option_group_id, "item_fk": item_id, "allow_multiple": group > 0, "is_required": group == 0})
+                for _ in range(options_per_group):
+                    option_id += 1
+                    lines.append({"type": "option", "id": option_id, "option_group_fk": option_group_id, "name": f"Option {option_id}", "price": round(rng.uniform(0, 3), 2)})
+
+    return "".join(json.dumps(line) + "\n" for line in lines).encode()
+
+
+async def login(client, username, password):
+    response = await client.post("/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def seed(client, args, rng):
+    admin = await login(client, ADMIN_USERNAME, ADMIN_PASSWORD)
+
+    body = menu_ndjson(rng, args.categories, args.items_per_category, args.option_groups_per_item, args.options_per_group)
+    response = await client.post(f"{P}/import-menu", content=body, headers={**admin, "Content-Type": "application/x-ndjson"})
+    response.raise_for_status()
+    menu_id = response.json()["menu_id"]
+
+    for number in range(args.locations):
+        location = {
+            "latitude": round(rng.uniform(43.5, 43.9), 6),
+            "longitude": round(rng.uniform(-79.7, -79.1), 6),
+            "name": f"Location {number}",
+            "address": f"{number} Bench Street",
+            "working_hours": "Mon-Fri 07:00-23:00; Sat-Sun 09:00-02:00",
+            "menu_fk": menu_id,
+        }
+        (await client.post(f"{P}/create-location", json=location, headers=admin)).raise_for_status()
+
+    for number in range(args.customers):
+        user = {"username": f"bench{number}", "email": f"bench{number}@example.com", "password": CUSTOMER_PASSWORD}
+        response = await client.post("/users/add", json=user)
+        if response.status_code >= 400 and number == 0:
+            response.raise_for_status()
+
+    return menu_id
+
+
+async def discover(client, admin, menu_id):
+    categories = []
+    cursor = None
+    while True:
+        params = {"limit": 100, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(f"{P}/list-category/{menu_id}", params=params, headers=admin)
+        response.raise_for_status()
+        categories.extend(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    items = [item for category in categories for item in category["items"]]
+    if not items:
+        raise RuntimeError(f"Menu {menu_id} has no items to benchmark.")
+
+    return {
+        "menu_id": menu_id,
+        "category_ids": [category["id"] for category in categories],
+        "items": items,
+        "orderable_items": [item for item in items if item["is_available"]] or items,
+        "option_ids": [option["id"] for item in items for group in item["option_groups"] for option in group["options"]],
+    }
+
+
+# Scenarios -------------------------------------------------------------------------------------------------------------
+def cart_line(rng, item):
+    option_ids = []
+    for group in item["option_groups"]:
+        if not group["options"]:
+            continue
+        if group["is_required"] or rng.random() < 0.3:
+            picks = rng.randint(1, len(group["options"])) if group["allow_multiple"] else 1
+            option_ids.extend(option["id"] for option in rng.sample(group["options"], picks))
+    return {"item_id": item["id"], "quantity": rng.randint(1, 3), "option_ids": option_ids}
+
+
+def build_request(name, rng, catalog, session):
+    admin, customer = session["admin"], session["customer"]
+
+    if name == "login":
+        return "POST", "/token", {"data": {"username": session["customer_username"], "password": session["customer_password"]}}
+    if name == "list_category":
+        return "GET", f"{P}/list-category/{catalog['menu_id']}", {"params": {"limit": 20}, "headers": admin}
+    if name == "get_category":
+        return "GET", f"{P}/get-category/{rng.choice(catalog['category_ids'])}", {"headers": admin}
+    if name == "get_item":
+        return "GET", f"{P}/get-item/{rng.choice(catalog['items'])['id']}", {"headers": admin}
+    if name == "list_item_admin":
+        return "GET", f"{P}/list-item/{rng.choice(catalog['category_ids'])}", {"params": {"limit": 50}, "headers": admin}
+    if name == "nearest_locations":
+        params = {"latitude": rng.uniform(43.5, 43.9), "longitude": rng.uniform(-79.7, -79.1), "limit": 10}
+        return "GET", f"{P}/nearest-locations", {"params": params, "headers": customer}
+    if name == "open_locations":
+        return "GET", f"{P}/open-locations", {"headers": customer}
+    if name == "price_cart":
+        lines = [cart_line(rng, rng.choice(catalog["orderable_items"])) for _ in range(rng.randint(1, 6))]
+        return "POST", f"{P}/price-cart/{catalog['menu_id']}", {"json": {"lines": lines}, "headers": customer}
+    if name == "patch_option":
+        if not catalog["option_ids"]:
+            return build_request("get_item", rng, catalog, session)
+        option_id = rng.choice(catalog["option_ids"])
+        return "PATCH", f"{P}/patch-option/{option_id}", {"json": {"price": round(rng.uniform(0, 3), 2)}, "headers": admin}
+
+    raise ValueError(f"Unknown scenario {name!r}.")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = {}
+        self.recording = False
+
+    def record(self, name, seconds, status):
+        if not self.recording:
+            return
+        self.latencies.setdefault(name, []).append(seconds)
+        self.statuses.setdefault(name, {}).setdefault(str(status), 0)
+        self.statuses[name][str(status)] += 1
+        if status == "error" or status >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+async def worker(client, worker_id, args, mix, catalog, session, recorder, deadline):
+    rng = random.Random(args.seed * 1000003 + worker_id)
+    names, weights = list(mix), list(mix.values())
+
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, url, kwargs = build_request(name, rng, catalog, session)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+            status = response.status_code
+        except httpx.HTTPError:
+            status = "error"
+        recorder.record(name, time.perf_counter() - started, status)
+
+
+# Report ----------------------------------------------------------------------------------------------------------------
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, statuses, elapsed):
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "statuses": statuses,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else None,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3) if values else None,
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3) if values else None,
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3) if values else None,
+        "max_ms": round(values[-1] * 1000, 3) if values else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(args, mix, recorder, elapsed, catalog):
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "target": args.url or args.database_url,
+            "concurrency": args.concurrency,
+            "duration_seconds": round(elapsed, 3),
+            "warmup_seconds": args.warmup,
+            "seed": args.seed,
+            "mix": mix,
+            "catalog": {"menu_id": catalog["menu_id"], "categories": len(catalog["category_ids"]), "items": len(catalog["items"]), "options": len(catalog["option_ids"])},
+        },
+        "total": summarize(all_latencies, sum(recorder.errors.values()), {}, elapsed),
+        "endpoints": {
+            name: summarize(recorder.latencies[name], recorder.errors.get(name, 0), recorder.statuses[name], elapsed)
+            for name in sorted(recorder.latencies)
+        },
+    }
+
+
+def compare(baseline, report):
+    print(f"{'endpoint':<20}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    rows = [("total", baseline.get("total", {}), report["total"])]
+    rows += [(name, baseline.get("endpoints", {}).get(name, {}), stats) for name, stats in report["endpoints"].items()]
+
+    for name, before, after in rows:
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            old, new = before.get(metric), after.get(metric)
+            change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else "n/a"
+            print(f"{name:<20}{metric:<16}{old if old is not None else '-':>12}{new if new is not None else '-':>12}{change:>10}")
+
+
+# Main ------------------------------------------------------------------------------------------------------------------
+def parse_mix(text):
+    if not text:
+        return dict(DEFAULT_MIX)
+
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown scenario {name.strip()!r}; choose from {', '.join(DEFAULT_MIX)}.")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Drive mixed traffic against app.main:app and report per-endpoint latency percentiles.")
+    parser.add_argument("--url", help="Benchmark an already running server instead of booting one.")
+    parser.add_argument("--database-url", help="Database for the booted server (default: a fresh SQLite file in a temp dir).")
+    parser.add_argument("--server-workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before the measured window.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", help="Comma separated scenario=weight pairs, e.g. get_item=5,price_cart=1.")
+    parser.add_argument("--skip-seed", action="store_true", help="Use existing data; requires --menu-id.")
+    parser.add_argument("--menu-id", type=int)
+    parser.add_argument("--customer-username", default="bench0")
+    parser.add_argument("--customer-password", default=CUSTOMER_PASSWORD)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--items-per-category", type=int, default=20)
+    parser.add_argument("--option-groups-per-item", type=int, default=2)
+    parser.add_argument("--options-per-group", type=int, default=4)
+    parser.add_argument("--locations", type=int, default=50)
+    parser.add_argument("--customers", type=int, default=5)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="Previous report to diff against.")
+
+    args = parser.parse_args(argv)
+    if args.skip_seed and args.menu_id is None:
+        parser.error("--skip-seed requires --menu-id.")
+    return args
+
+
+async def run(args):
+    mix = parse_mix(args.mix)
+    process = None
+    temp_dir = None
+
+    if args.url:
+        base_url = args.url
+    else:
+        if not args.database_url:
+            temp_dir = tempfile.TemporaryDirectory()
+            args.database_url = f"sqlite+aiosqlite:///{temp_dir.name}/bench.db"
+        process, base_url = await boot_server(args.database_url, args.server_workers)
+
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            rng = random.Random(args.seed)
+            menu_id = args.menu_id if args.skip_seed else await seed(client, args, rng)
+            admin = await login(client, ADMIN_USERNAME, ADMIN_PASSWORD)
+            catalog = await discover(client, admin, menu_id)
+            session = {
+                "admin": admin,
+                "customer": await login(client, args.customer_username, args.customer_password),
+                "customer_username": args.customer_username,
+                "customer_password": args.customer_password,
+            }
+
+            recorder = Recorder()
+            started = time.perf_counter()
+            deadline = started + args.warmup + args.duration
+            workers = [asyncio.create_task(worker(client, number, args, mix, catalog, session, recorder, deadline)) for number in range(args.concurrency)]
+
+            await asyncio.sleep(args.warmup)
+            recorder.recording = True
+            measured_from = time.perf_counter()
+            await asyncio.gather(*workers)
+            elapsed = time.perf_counter() - measured_from
+    finally:
+        if process is not None:
+            process.terminate()
+            await asyncio.to_thread(process.wait, timeout=10)
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    return build_report(args, mix, recorder, elapsed, catalog)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(json.dumps(report["total"], indent=2))
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+# Settings are read once at import, so the environment has to be in place before anything under app/ is imported.
+DATA_DIR = tempfile.mkdtemp(prefix="oo-tests-")
+
+os.environ.setdefault("PROJECT_NAME", "oo-fastapi")
+os.environ.setdefault("VERSION", "test")
+os.environ.setdefault("DEBUG", "true")
+os.environ.setdefault("SQLITE_URL", f"sqlite+aiosqlite:///{DATA_DIR}/oo.db")
+os.environ.setdefault("POSTGRES_URL", "postgresql://unused")
+os.environ.setdefault("POSTGRES_URL_ASYNC", "postgresql+asyncpg://unused")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-of-at-least-32-bytes")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("AUTO_MIGRATE", "true")
+os.environ.setdefault("INVALIDATION_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
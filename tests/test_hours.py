@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.onlineordering.hours import MINUTES_PER_DAY, MINUTES_PER_WEEK, OpeningHoursIndex, parse_working_hours
+
+
+# 2024-01-01 is a Monday.
+def at(day, hour, minute=0):
+    return datetime(2024, 1, 1 + day, hour, minute)
+
+
+def location(location_id, working_hours, is_active=True):
+    return SimpleNamespace(
+        id=location_id,
+        latitude=0.0,
+        longitude=0.0,
+        name=f"Location {location_id}",
+        address="",
+        working_hours=working_hours,
+        opening_intervals=parse_working_hours(working_hours),
+        is_active=is_active,
+        menu_fk=None,
+    )
+
+
+def loaded_index(*locations):
+    index = OpeningHoursIndex(session_factory=None)
+    index._loaded = True
+    for row in locations:
+        index.upsert(row)
+    return index
+
+
+def test_parse_working_hours_merges_and_wraps():
+    assert parse_working_hours("Daily 00:00-24:00") == [[0, MINUTES_PER_WEEK]]
+    assert parse_working_hours("Mon 09:00-12:00, 11:00-13:00") == [[9 * 60, 13 * 60]]
+    # Past midnight on Sunday runs into Monday morning.
+    assert parse_working_hours("Sun 22:00-02:00") == [[0, 2 * 60], [6 * MINUTES_PER_DAY + 22 * 60, MINUTES_PER_WEEK]]
+    assert parse_working_hours("Fri-Mon 10:00-11:00") == [
+        [day * MINUTES_PER_DAY + 10 * 60, day * MINUTES_PER_DAY + 11 * 60] for day in (0, 4, 5, 6)
+    ]
+    assert parse_working_hours("Mon-Sun closed") == []
+
+
+@pytest.mark.parametrize("text", ["Mon", "Mo 09:00-17:00", "Mon 9-17", "Mon 09:00-24:30", "Mon 25:00-26:00"])
+def test_parse_working_hours_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_working_hours(text)
+
+
+def test_open_locations_at_bucket_edges():
+    index = loaded_index(
+        location(1, "Mon-Fri 09:30-17:00"),
+        location(2, "Daily 00:00-24:00"),
+        location(3, "Sat 20:00-02:00"),
+        location(4, "Daily 00:00-24:00", is_active=False),
+    )
+
+    def open_ids(moment):
+        return [row["id"] for row in asyncio.run(index.open_locations(moment))]
+
+    assert open_ids(at(0, 9, 29)) == [2]
+    assert open_ids(at(0, 9, 30)) == [1, 2]
+    assert open_ids(at(4, 16, 59)) == [1, 2]
+    assert open_ids(at(4, 17, 0)) == [2]
+    assert open_ids(at(6, 1, 59)) == [2, 3]
+    assert open_ids(at(6, 2, 0)) == [2]
+
+
+def test_is_open_follows_upsert_and_remove():
+    index = loaded_index(location(1, "Mon 09:00-17:00"))
+    assert asyncio.run(index.is_open(1, at(0, 10)))
+
+    index.upsert(location(1, "Tue 09:00-17:00"))
+    assert not asyncio.run(index.is_open(1, at(0, 10)))
+    assert asyncio.run(index.is_open(1, at(1, 10)))
+
+    index.remove(1)
+    assert not asyncio.run(index.is_open(1, at(1, 10)))
+    assert asyncio.run(index.open_locations(at(1, 10))) == []
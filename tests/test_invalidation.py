@@ -0,0 +1,92 @@
+import asyncio
+import os
+import socket
+
+from app.core.invalidation import MAX_IDS_PER_MESSAGE, InvalidationBus, MemoryBackend, UnixSocketBackend
+
+
+class Recorder:
+    def __init__(self, bus, topic="menu"):
+        self.received = []
+        self.arrived = asyncio.Event()
+        bus.subscribe(topic, self.handle)
+
+    async def handle(self, invalidation):
+        self.received.append(invalidation)
+        self.arrived.set()
+
+    async def wait(self, count):
+        while sum(len(invalidation.ids) for invalidation in self.received) < count:
+            self.arrived.clear()
+            await asyncio.wait_for(self.arrived.wait(), timeout=2)
+
+
+def test_memory_backend_skips_the_publisher():
+    async def scenario():
+        backend = MemoryBackend()
+        publisher, peer = InvalidationBus(backend), InvalidationBus(backend)
+        own, theirs = Recorder(publisher), Recorder(peer)
+        await publisher.start()
+        await peer.start()
+
+        publisher.publish("menu", 3, None, 1, 3)
+        await theirs.wait(2)
+        await asyncio.sleep(0)
+
+        assert [invalidation.ids for invalidation in theirs.received] == [(1, 3)]
+        assert theirs.received[0].origin == publisher.origin
+        assert own.received == []
+        assert publisher.stats()["published"] == 1
+        assert peer.stats()["received"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_publish_before_start_is_dropped():
+    bus = InvalidationBus(MemoryBackend())
+    bus.publish("menu", 1)
+
+    assert bus.stats()["published"] == 0
+
+
+def test_unix_sockets_cross_buses_and_split_large_messages(tmp_path):
+    directory = str(tmp_path / "bus")
+
+    async def scenario():
+        publisher = InvalidationBus(UnixSocketBackend(directory))
+        peer = InvalidationBus(UnixSocketBackend(directory))
+        recorder = Recorder(peer)
+        await publisher.start()
+        await peer.start()
+
+        ids = range(1, 2 * MAX_IDS_PER_MESSAGE + 2)
+        publisher.publish("menu", *ids)
+        await recorder.wait(len(ids))
+
+        assert [len(invalidation.ids) for invalidation in recorder.received] == [MAX_IDS_PER_MESSAGE, MAX_IDS_PER_MESSAGE, 1]
+        assert len({invalidation.id for invalidation in recorder.received}) == 3
+
+        await peer.stop()
+        await publisher.stop()
+        assert os.listdir(directory) == []
+
+    asyncio.run(scenario())
+
+
+def test_unix_sockets_forget_dead_workers(tmp_path):
+    directory = str(tmp_path / "bus")
+    os.makedirs(directory)
+    # A socket file left by a worker that died without unlinking it.
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    dead.bind(os.path.join(directory, "1-deadbeef.sock"))
+    dead.close()
+
+    async def scenario():
+        publisher = InvalidationBus(UnixSocketBackend(directory))
+        await publisher.start()
+        publisher.publish("menu", 1)
+
+        assert os.listdir(directory) == [os.path.basename(publisher.backend._path)]
+        await publisher.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.onlineordering.pricing import OptionRules, PriceTable
+from app.onlineordering.schemas import CartLine
+
+
+def option_group(group_id, options, allow_multiple=False, is_required=False):
+    return {"id": group_id, "allow_multiple": allow_multiple, "is_required": is_required, "options": options}
+
+
+def option(option_id, price):
+    return {"id": option_id, "name": f"Option {option_id}", "price": price}
+
+
+def item(item_id, price, option_groups=(), is_available=True):
+    return {"id": item_id, "name": f"Item {item_id}", "price": price, "is_available": is_available, "option_groups": list(option_groups)}
+
+
+# Ids are spread out and out of order on purpose: they are global serials, not positions.
+ITEMS = [
+    item(
+        900,
+        10.0,
+        [
+            option_group(40, [option(7001, 0.0), option(7002, 1.5)], is_required=True),
+            option_group(12, [option(7003, 0.5), option(7004, 0.75), option(7005, 1.0)], allow_multiple=True),
+        ],
+    ),
+    item(31, 2.25),
+    item(5000, 4.0, is_available=False),
+]
+
+
+@pytest.fixture
+def table():
+    snapshot = SimpleNamespace(menu_id=3, version=8, item_index={row["id"]: row for row in ITEMS})
+    return PriceTable.build(snapshot)
+
+
+def rejected(table, *lines):
+    with pytest.raises(HTTPException) as error:
+        table.price([CartLine(**line) for line in lines])
+    return error.value.status_code, error.value.detail
+
+
+def test_price_table_totals(table):
+    priced = table.price(
+        [
+            CartLine(item_id=900, quantity=2, option_ids=[7002, 7003, 7005]),
+            CartLine(item_id=31, quantity=3),
+        ]
+    )
+
+    assert priced["menu_id"] == 3
+    assert [(line["unit_price"], line["line_total"]) for line in priced["lines"]] == [(13.0, 26.0), (2.25, 6.75)]
+    assert priced["total"] == 32.75
+    assert table.version == 8
+
+
+def test_price_table_rejects_unknown_and_unavailable_items(table):
+    assert rejected(table, {"item_id": 77}) == (404, "Item 77 not found in menu 3.")
+    assert rejected(table, {"item_id": 5000}) == (400, "Item 5000 is not available.")
+
+
+def test_price_table_rejects_options_of_other_items(table):
+    assert rejected(table, {"item_id": 31, "option_ids": [7001]}) == (400, "Option 7001 does not belong to item 31.")
+    assert rejected(table, {"item_id": 900, "option_ids": [7001, 123]}) == (400, "Option 123 does not belong to item 900.")
+
+
+def test_option_rules_masks():
+    rules = OptionRules.build(ITEMS[0])
+
+    assert rules.group_ids == (40, 12)
+    assert rules.required_mask == 0b01
+    assert rules.max_select == (1, 3)
+    assert OptionRules.build(ITEMS[1]) == OptionRules(group_ids=(), required_mask=0, max_select=())
+
+
+def test_validate_line_accepts_valid_selections(table):
+    assert len(table.validate_line(CartLine(item_id=900, option_ids=[7001]))) == 1
+    assert len(table.validate_line(CartLine(item_id=900, option_ids=[7005, 7002, 7003, 7004]))) == 4
+
+
+def test_validate_line_rejects_missing_required_group(table):
+    assert rejected(table, {"item_id": 900}) == (400, "Option Group 40 of item 900 is required.")
+    assert rejected(table, {"item_id": 900, "option_ids": [7003]}) == (400, "Option Group 40 of item 900 is required.")
+
+
+def test_validate_line_rejects_too_many_selections(table):
+    assert rejected(table, {"item_id": 900, "option_ids": [7001, 7002]}) == (400, "Option Group 40 of item 900 allows at most 1 selection(s).")
+
+
+def test_validate_line_rejects_duplicate_options(table):
+    assert rejected(table, {"item_id": 900, "option_ids": [7001, 7003, 7003]}) == (400, "Item 900 has an option selected more than once.")
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+P = "/online-ordering"
+
+
+@pytest.fixture(scope="module")
+def client():
+    # The lifespan migrates the test database (AUTO_MIGRATE), which also creates the admin user.
+    with TestClient(app, raise_server_exceptions=False) as client:
+        token = client.post("/token", data={"username": "admin", "password": "admin"}).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        yield client
+
+
+@pytest.fixture(scope="module")
+def menu_id(client):
+    body = json.dumps({"type": "menu", "name": "Routes", "description": None, "price_unit": "USD"}) + "\n"
+    response = client.post(f"{P}/import-menu", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200, response.text
+    return response.json()["menu_id"]
+
+
+def ok(response):
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_mutations_return_their_nested_models(client, menu_id):
+    category = ok(client.post(f"{P}/create-category/{menu_id}", json={"name": "Pizza"}))
+    assert category["items"] == []
+    item = ok(client.post(f"{P}/create-item/{category['id']}", json={"name": "Margherita", "price": 10}))
+    assert item["option_groups"] == []
+    option_group = ok(client.post(f"{P}/create-option-group/{item['id']}", json={"allow_multiple": False, "is_required": True}))
+    assert option_group["options"] == []
+    option = ok(client.post(f"{P}/create-option/{option_group['id']}", json={"name": "Large", "price": 2.5}))
+
+    assert ok(client.patch(f"{P}/patch-option-group/{option_group['id']}", json={"allow_multiple": True}))["options"] == [option]
+    patched_item = ok(client.patch(f"{P}/patch-item/{item['id']}", json={"price": 11}))
+    assert patched_item["price"] == 11
+    assert patched_item["option_groups"][0]["options"] == [option]
+    patched_category = ok(client.patch(f"{P}/patch-category/{category['id']}", json={"name": "Pizzas"}))
+    assert patched_category["items"] == [patched_item]
+
+    # Reads come from the menu snapshot, which the mutations above must have retired.
+    assert ok(client.get(f"{P}/get-category/{category['id']}")) == patched_category
+    assert ok(client.get(f"{P}/list-item/{category['id']}")) == [patched_item]
+    assert ok(client.get(f"{P}/list-category/{menu_id}")) == [patched_category]
+
+
+def test_catalog_reads_revalidate_with_etags(client, menu_id):
+    category = ok(client.post(f"{P}/create-category/{menu_id}", json={"name": "Drinks"}))
+    response = client.get(f"{P}/get-category/{category['id']}")
+    etag = response.headers["ETag"]
+
+    assert client.get(f"{P}/get-category/{category['id']}", headers={"If-None-Match": etag}).status_code == 304
+
+    ok(client.post(f"{P}/create-item/{category['id']}", json={"name": "Cola", "price": 2}))
+    response = client.get(f"{P}/get-category/{category['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize(
+    "method, path, detail",
+    [
+        ("get", "/get-location/999999", "Location not found."),
+        ("delete", "/delete-location/999999", "Location not found."),
+        ("get", "/get-item/999999", "Item not found."),
+        ("get", "/get-category/999999", "Category not found."),
+        ("get", "/list-category/999999", "Menu not found."),
+    ],
+)
+def test_unknown_ids_are_404(client, method, path, detail):
+    response = client.request(method.upper(), P + path)
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": detail}
+
+
+def test_delete_location_removes_its_zones(client, menu_id):
+    location = ok(
+        client.post(
+            f"{P}/create-location",
+            json={"menu_fk": menu_id, "latitude": 43.65, "longitude": -79.38, "name": "A", "address": "x", "working_hours": "Daily 00:00-24:00", "is_active": True},
+        )
+    )
+    ok(client.post(f"{P}/create-delivery-zone/{location['id']}", json={"name": "Z", "polygon": [[43.6, -79.4], [43.7, -79.4], [43.7, -79.3]]}))
+
+    ok(client.delete(f"{P}/delete-location/{location['id']}"))
+
+    assert ok(client.get(f"{P}/list-delivery-zone/{location['id']}")) == []
+    assert client.get(f"{P}/get-location/{location['id']}").status_code == 404
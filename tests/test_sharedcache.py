@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from app.core.sharedcache import SharedCache
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "catalog")
+
+
+def test_versions_are_shared_between_instances(directory):
+    first, second = SharedCache(directory, slots=16), SharedCache(directory, slots=16)
+
+    assert first.version(3) == 0
+    assert first.bump(3) == 1
+    assert second.bump(3) == 2
+    assert first.version(3) == 2
+    # Keys on the same slot share a counter: an extra rebuild, never a missed bump.
+    assert second.version(19) == 2
+    assert second.version(4) == 0
+
+
+def test_blobs_round_trip_and_replace_older_versions(directory):
+    writer, reader = SharedCache(directory, slots=16), SharedCache(directory, slots=16)
+    writer.put("menu-1", 1, [{"id": 1, "span": [1, 3]}], b"[{}]")
+
+    blob = reader.get("menu-1", 1)
+    assert blob.index == [{"id": 1, "span": [1, 3]}]
+    assert bytes(blob.payload) == b"[{}]"
+    assert reader.get("menu-1", 2) is None
+
+    writer.put("menu-1", 2, [], b"[]")
+    assert sorted(os.listdir(directory)) == ["menu-1.2"]
+    assert bytes(reader.get("menu-1", 2).payload) == b"[]"
+    assert reader.names() == {"menu-1"}
+    assert reader.stats() == {"mapped": 1, "hits": 2, "misses": 1, "writes": 0}
+
+
+def test_first_worker_restamps_later_workers_join(directory):
+    first = SharedCache(directory, slots=16)
+    first.attach()
+    generation = first.generation()
+    first.put("menu-1", 1, [], b"[]")
+
+    joining = SharedCache(directory, slots=16)
+    joining.attach()
+    assert joining.generation() == generation
+    assert joining.get("menu-1", 1) is not None
+
+    # Every worker is gone: the next one to start finds no live holder and drops what they left behind.
+    first._live.close()
+    joining._live.close()
+    restarted = SharedCache(directory, slots=16)
+    restarted.attach()
+    assert restarted.generation() != generation
+    assert restarted.get("menu-1", 1) is None
+
+
+def test_claims_are_granted_once_per_host(directory):
+    first, second = SharedCache(directory, slots=16), SharedCache(directory, slots=16)
+
+    assert first.claim(0xABCDEF)
+    assert not second.claim(0xABCDEF)
+    assert not first.claim(0xABCDEF)
+    assert second.claim(0xABCDF0)
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from app.core.database_async import reading_own_writes
+from app.core.security import Principal
+from app.core.singleflight import SingleFlight, single_flight
+from app.user.models import Role
+
+
+class Gate:
+    # Counts calls and holds every one of them until released, so concurrent callers are guaranteed to overlap.
+    def __init__(self):
+        self.calls = 0
+        self.released = asyncio.Event()
+
+    async def __call__(self, result="value"):
+        self.calls += 1
+        await self.released.wait()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flights, gate = SingleFlight(), Gate()
+        tasks = [asyncio.create_task(flights.do(("key", 1), gate)) for _ in range(10)]
+        other = asyncio.create_task(flights.do(("key", 2), lambda: gate("other")))
+        await settle()
+        gate.released.set()
+
+        assert await asyncio.gather(*tasks) == ["value"] * 10
+        assert await other == "other"
+        assert gate.calls == 2
+        assert flights.stats() == {"in_flight": 0, "leaders": 2, "followers": 9}
+
+    asyncio.run(scenario())
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    async def scenario():
+        flights, gate = SingleFlight(), Gate()
+
+        async def failing():
+            return await gate(LookupError("boom"))
+
+        tasks = [asyncio.create_task(flights.do("key", failing)) for _ in range(3)]
+        await settle()
+        gate.released.set()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert [type(result) for result in results] == [LookupError] * 3
+        assert await flights.do("key", gate) == "value"
+        assert gate.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_follower_takes_over_when_leader_is_cancelled():
+    async def scenario():
+        flights, gate = SingleFlight(), Gate()
+        leader = asyncio.create_task(flights.do("key", gate))
+        await settle()
+        follower = asyncio.create_task(flights.do("key", gate))
+        await settle()
+
+        leader.cancel()
+        await settle()
+        gate.released.set()
+
+        assert await follower == "value"
+        assert leader.cancelled()
+        assert gate.calls == 2
+
+    asyncio.run(scenario())
+
+
+class Reads:
+    def __init__(self):
+        self.gate = Gate()
+
+    @single_flight
+    async def get(self, current_user, item_id, tags=()):
+        return await self.gate((current_user.role, item_id))
+
+
+def test_single_flight_keys_on_role_and_arguments():
+    admin = Principal(id=1, username="admin", role=Role.SuperAdmin)
+    other_admin = Principal(id=2, username="other", role=Role.SuperAdmin)
+    customer = Principal(id=3, username="customer", role=Role.Customer)
+
+    async def scenario():
+        reads = Reads()
+        calls = [
+            reads.get(admin, 1),
+            reads.get(current_user=other_admin, item_id=1),
+            reads.get(customer, 1),
+            reads.get(admin, 2),
+        ]
+        tasks = [asyncio.create_task(call) for call in calls]
+        await settle()
+        reads.gate.released.set()
+
+        results = await asyncio.gather(*tasks)
+        assert results == [(Role.SuperAdmin, 1), (Role.SuperAdmin, 1), (Role.Customer, 1), (Role.SuperAdmin, 2)]
+        assert reads.gate.calls == 3
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("own_writes, tags", [(True, ()), (False, ["unhashable"])])
+def test_single_flight_runs_alone(own_writes, tags):
+    admin = Principal(id=1, username="admin", role=Role.SuperAdmin)
+
+    async def scenario():
+        reading_own_writes.set(own_writes)
+        reads = Reads()
+        tasks = [asyncio.create_task(reads.get(admin, 1, tags)) for _ in range(3)]
+        await settle()
+        reads.gate.released.set()
+
+        await asyncio.gather(*tasks)
+        assert reads.gate.calls == 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,134 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.onlineordering.spatial import CompiledZone, DeliveryZoneIndex, LocationGridIndex, haversine_km
+
+
+# A U opening north: the notch between longitudes 1 and 2 above latitude 1 is outside.
+U_SHAPE = [[0, 0], [0, 3], [3, 3], [3, 2], [1, 2], [1, 1], [3, 1], [3, 0]]
+
+
+def zone(zone_id, polygon, location_id=1):
+    return SimpleNamespace(id=zone_id, location_fk=location_id, name=f"Zone {zone_id}", polygon=polygon)
+
+
+@pytest.mark.parametrize(
+    "point, inside",
+    [
+        ((0.5, 1.5), True),
+        ((2.0, 0.5), True),
+        ((2.0, 2.5), True),
+        ((1.0, 0.5), True),  # level with two vertices
+        ((2.0, 1.5), False),  # in the notch
+        ((3.5, 0.5), False),
+        ((-0.1, 1.5), False),
+    ],
+)
+def test_compiled_zone_contains_concave(point, inside):
+    assert CompiledZone(zone(1, U_SHAPE)).contains(*point) is inside
+
+
+def test_compiled_zone_triangle():
+    triangle = CompiledZone(zone(1, [[0, 0], [0, 4], [4, 0]]))
+
+    assert triangle.contains(1, 1)
+    assert not triangle.contains(2.5, 2.5)
+    assert triangle.bbox == (0, 0, 4, 4)
+
+
+def loaded_index(*zones):
+    index = DeliveryZoneIndex(session_factory=None, cell_degrees=0.5)
+    index._loaded = True
+    for row in zones:
+        index.upsert(row)
+    return index
+
+
+def lookup(index, latitude, longitude):
+    return [match["zone_id"] for match in asyncio.run(index.lookup(latitude, longitude))]
+
+
+def test_delivery_zone_index_lookup():
+    index = loaded_index(zone(1, U_SHAPE, location_id=10), zone(2, [[2, 0], [2, 1], [4, 1], [4, 0]], location_id=20))
+
+    assert lookup(index, 2.5, 0.5) == [1, 2]
+    assert lookup(index, 2.0, 1.5) == []
+    assert lookup(index, 3.5, 0.5) == [2]
+
+    index.set_location_active(20, False)
+    assert lookup(index, 2.5, 0.5) == [1]
+    index.set_location_active(20, True)
+    assert lookup(index, 2.5, 0.5) == [1, 2]
+
+
+def test_delivery_zone_index_moves_and_removes():
+    index = loaded_index(zone(1, U_SHAPE, location_id=10), zone(2, [[2, 0], [2, 1], [4, 1], [4, 0]], location_id=20))
+
+    index.upsert(zone(2, [[10, 10], [10, 11], [11, 11], [11, 10]], location_id=20))
+    assert lookup(index, 3.5, 0.5) == []
+    assert lookup(index, 10.5, 10.5) == [2]
+
+    index.remove_location(10)
+    assert lookup(index, 2.5, 0.5) == []
+    assert all(1 not in bucket for bucket in index._cells.values())
+
+
+def location(location_id, latitude, longitude, is_active=True):
+    return SimpleNamespace(
+        id=location_id,
+        latitude=latitude,
+        longitude=longitude,
+        name=f"Location {location_id}",
+        address="",
+        working_hours=None,
+        is_active=is_active,
+        menu_fk=None,
+    )
+
+
+@pytest.fixture
+def scattered():
+    rng = random.Random(7)
+    locations = [location(location_id, rng.uniform(40, 50), rng.uniform(-80, -70)) for location_id in range(1, 301)]
+    index = LocationGridIndex(session_factory=None, cell_degrees=0.1)
+    index._loaded = True
+    for row in locations:
+        index.upsert(row)
+    return index, locations
+
+
+def by_distance(locations, latitude, longitude):
+    return sorted(locations, key=lambda row: haversine_km(latitude, longitude, row.latitude, row.longitude))
+
+
+@pytest.mark.parametrize("point", [(45.0, -75.0), (40.0, -80.0), (60.0, -60.0), (-10.0, 100.0)])
+def test_nearest_matches_brute_force(scattered, point):
+    index, locations = scattered
+
+    nearest = asyncio.run(index.nearest(*point, limit=5))
+
+    assert [row["id"] for row in nearest] == [row.id for row in by_distance(locations, *point)[:5]]
+
+
+def test_nearest_within_radius(scattered):
+    index, locations = scattered
+    expected = [row.id for row in by_distance(locations, 45.0, -75.0) if haversine_km(45.0, -75.0, row.latitude, row.longitude) <= 50]
+
+    nearest = asyncio.run(index.nearest(45.0, -75.0, limit=1000, radius_km=50))
+
+    assert [row["id"] for row in nearest] == expected
+    assert all(row["distance_km"] <= 50 for row in nearest)
+
+
+def test_nearest_skips_inactive_and_removed(scattered):
+    index, locations = scattered
+    first, second, third = by_distance(locations, 45.0, -75.0)[:3]
+
+    index.upsert(location(first.id, first.latitude, first.longitude, is_active=False))
+    index.remove(second.id)
+
+    assert asyncio.run(index.nearest(45.0, -75.0, limit=1))[0]["id"] == third.id
+    assert len(index) == len(locations) - 2
@@ -0,0 +1,104 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core import utils
+from app.core.utils import TTLCache, decode_cursor, encode_cursor, next_cursor, page_rows
+
+
+ROWS = [{"id": row_id} for row_id in (2, 3, 5, 8, 13, 21)]
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(1234)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == 1234
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor("12"), "eyJsYXN0IjogMX0"])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+def test_page_rows_by_offset():
+    assert page_rows(ROWS, 0, 2) == [{"id": 2}, {"id": 3}]
+    assert page_rows(ROWS, 4, 10) == [{"id": 13}, {"id": 21}]
+    assert page_rows(ROWS, 10, 2) == []
+
+
+def test_page_rows_cursor_wins_over_offset():
+    assert page_rows(ROWS, 4, 2, encode_cursor(3)) == [{"id": 5}, {"id": 8}]
+    # An id that is gone (deleted since the page was served) still resumes after its position.
+    assert page_rows(ROWS, 0, 2, encode_cursor(4)) == [{"id": 5}, {"id": 8}]
+    assert page_rows(ROWS, 0, 2, encode_cursor(21)) == []
+
+
+def test_walking_cursors_visits_every_row_once():
+    seen = []
+    cursor = None
+    while True:
+        page = page_rows(ROWS, 0, 4, cursor)
+        seen.extend(row["id"] for row in page)
+        cursor = next_cursor(page, 4)
+        if cursor is None:
+            break
+
+    assert seen == [row["id"] for row in ROWS]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_ttl_cache_expires_entries(clock):
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+
+    clock[0] += 4.9
+    assert cache.get("a") == 1
+    clock[0] += 0.1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_per_entry_ttl_is_capped(clock):
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("short", 1, ttl=1)
+    cache.set("long", 2, ttl=60)
+    cache.set("expired", 3, ttl=0)
+
+    clock[0] += 2
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    clock[0] += 3
+    assert cache.get("long") is None
+    assert cache.get("expired") is None
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    cache = TTLCache(maxsize=2, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_discard_where(clock):
+    cache = TTLCache(maxsize=10, ttl=5)
+    for user_id in range(4):
+        cache.set(f"token-{user_id}", {"id": user_id % 2})
+
+    cache.discard_where(lambda principal: principal["id"] == 1)
+
+    assert sorted(key for key in ("token-0", "token-1", "token-2", "token-3") if cache.get(key)) == ["token-0", "token-2"]